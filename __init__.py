@@ -68,8 +68,14 @@ def register():
     # Register shortcuts
     register_shortcuts()
 
+    # Register handlers keeping the stats cache up to date
+    utils.register_handlers()
+
 
 def unregister():
+    # Unregister handlers
+    utils.unregister_handlers()
+
     # Unregister shortcuts
     unregister_shortcuts()
 
@@ -0,0 +1,206 @@
+"""Batch performance stats for a directory of avatar files.
+
+Run it with Blender in background mode:
+
+    blender -b --python batch_stats.py -- <directory> [--output report.json] [--workers 4] [--timeout 300]
+
+Every .blend and .fbx file found in the directory is opened in its own worker
+Blender process, rated for both the PC and STANDALONE profiles and collected
+into a single JSON or CSV report (picked by the extension of --output).
+A worker that crashes or runs past the timeout is recorded in the report and
+doesn't stop the rest of the batch.
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+
+SUPPORTED_EXTENSIONS = {'.blend', '.fbx'}
+DEVICE_MODES = ('PC', 'STANDALONE')
+STAT_KEYS = ('tri_count', 'material_count', 'bone_count', 'skinned_meshes')
+
+
+def load_utils():
+    """Load the add-on's utils module without registering the add-on."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "utils.py")
+    spec = importlib.util.spec_from_file_location("dogs_utils", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog="blender -b --python batch_stats.py --")
+    parser.add_argument("directory", nargs='?', help="Directory searched recursively for .blend and .fbx files")
+    parser.add_argument("--output", default="dogs_stats_report.json", help="Report path, .json or .csv")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Number of worker Blender processes")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds a single file may take")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+# ----------------- Worker -----------------
+
+def rate(utils, armature_name, rating_mode):
+    stats = utils.get_performance_stats(armature_name, rating_mode)
+    if stats is None:
+        return None
+
+    stats["ratings"] = {device_mode: utils.get_rating(stats, device_mode) for device_mode in DEVICE_MODES}
+    return stats
+
+
+def run_worker(file_path, result_path):
+    """Rate the scene and every armature of one file and write the result as JSON."""
+    start = time.perf_counter()
+
+    # .blend files are opened by Blender itself before the script runs
+    if file_path.lower().endswith('.fbx'):
+        bpy.ops.wm.read_homefile(use_empty=True)
+        bpy.ops.import_scene.fbx(filepath=file_path)
+
+    utils = load_utils()
+
+    result = {
+        "file": file_path,
+        "status": "ok",
+        "scene": rate(utils, None, 'SCENE'),
+        # Every armature is rated in one shared pass
+        "armatures": dict(utils.get_all_armature_stats()),
+    }
+    result["elapsed"] = time.perf_counter() - start
+
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+# ----------------- Batch -----------------
+
+def find_files(directory):
+    files = []
+    for root, _dirs, names in os.walk(directory):
+        for name in names:
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+def process_file(file_path, timeout):
+    """Rate one file in a separate Blender process and return its result."""
+    fd, result_path = tempfile.mkstemp(suffix=".json", prefix="dogs_stats_")
+    os.close(fd)
+
+    command = [bpy.app.binary_path, "-b", "--factory-startup"]
+    if file_path.lower().endswith('.blend'):
+        command.append(file_path)
+    command += ["--python-exit-code", "1", "--python", os.path.abspath(__file__),
+                "--", "--worker", file_path, "--result", result_path]
+
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+
+        if process.returncode == 0 and os.path.getsize(result_path) > 0:
+            with open(result_path, encoding='utf-8') as f:
+                return json.load(f)
+
+        return {
+            "file": file_path,
+            "status": "crashed",
+            "error": (process.stderr or process.stdout).strip()[-2000:],
+            "elapsed": time.perf_counter() - start,
+        }
+    except subprocess.TimeoutExpired:
+        return {
+            "file": file_path,
+            "status": "timeout",
+            "error": f"No result after {timeout:.0f} seconds",
+            "elapsed": time.perf_counter() - start,
+        }
+    except (OSError, ValueError) as e:
+        return {"file": file_path, "status": "error", "error": str(e), "elapsed": time.perf_counter() - start}
+    finally:
+        if os.path.exists(result_path):
+            os.remove(result_path)
+
+
+def report_rows(results):
+    """Flatten the results into one row per rated scope."""
+    for result in results:
+        base = {"file": result["file"], "status": result["status"], "error": result.get("error", "")}
+
+        if result["status"] != "ok":
+            yield dict(base, scope="", armature="")
+            continue
+
+        scopes = [("SCENE", "", result["scene"])]
+        scopes += [("ARMATURE", name, stats) for name, stats in result["armatures"].items()]
+
+        for scope, armature, stats in scopes:
+            row = dict(base, scope=scope, armature=armature)
+            if stats:
+                row.update({key: stats[key] for key in STAT_KEYS})
+                row.update({f"rating_{device_mode.lower()}": stats["ratings"][device_mode] for device_mode in DEVICE_MODES})
+            yield row
+
+
+def write_report(results, output):
+    if output.lower().endswith('.csv'):
+        fieldnames = ["file", "status", "scope", "armature", *STAT_KEYS,
+                      *(f"rating_{device_mode.lower()}" for device_mode in DEVICE_MODES), "error"]
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(report_rows(results))
+    else:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+def run_batch(args):
+    files = find_files(args.directory)
+    if not files:
+        print(f"No .blend or .fbx files found in '{args.directory}'.")
+        return
+
+    print(f"Rating {len(files)} files with {args.workers} workers...")
+    start = time.perf_counter()
+
+    results = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for result in pool.map(lambda path: process_file(path, args.timeout), files):
+            results.append(result)
+            print(f"[{len(results)}/{len(files)}] {result['status']}: {result['file']}")
+
+    write_report(results, args.output)
+
+    failed = sum(1 for result in results if result["status"] != "ok")
+    print(f"Done in {time.perf_counter() - start:.1f}s, {failed} failed. Report written to '{args.output}'.")
+
+
+def main():
+    args = parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.result)
+    elif args.directory:
+        run_batch(args)
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
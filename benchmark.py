@@ -0,0 +1,342 @@
+"""Benchmark of the stats path and the Stats panel on synthetic avatars.
+
+Run it with Blender in background mode:
+
+    blender -b --factory-startup --python benchmark.py -- [--objects 10,60] [--tris 1000,20000]
+        [--modifiers ARMATURE,SUBSURF,MIRROR,DECIMATE,NODES] [--shape-keys 0,20]
+        [--armature Extended] [--bones 0] [--repeat 20] [--output bench.json] [--compare old.json]
+
+Every combination of object count, triangles per object and shape key count is
+built as a synthetic avatar parented to an armature from ARMATURE_TYPES. The
+script times cold and warm get_performance_stats calls for the armature and the
+scene, the all-armatures pass and STATS_PT_panel.draw. Results are written as
+JSON, and --compare prints the ratio to a previous result file.
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+import bpy
+
+
+# ----------------- Add-on Loading -----------------
+
+def load_addon():
+    """Import and register the add-on package this script lives in."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    name = os.path.basename(directory)
+    if not name.isidentifier():
+        name = "dogs"
+
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(directory, "__init__.py"), submodule_search_locations=[directory]
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[name] = addon
+    spec.loader.exec_module(addon)
+    addon.register()
+    return addon
+
+
+# ----------------- Synthetic Avatars -----------------
+
+def add_armature(armature_type, extra_bones):
+    """Create an armature from an ARMATURE_TYPES template, extended with a chain of extra bones."""
+    template = utils.ARMATURE_TYPES[armature_type]
+
+    armature_data = bpy.data.armatures.new(template['name'])
+    armature = bpy.data.objects.new(template['name'], armature_data)
+    bpy.context.scene.collection.objects.link(armature)
+    bpy.context.view_layer.objects.active = armature
+
+    bpy.ops.object.mode_set(mode='EDIT')
+
+    bones = {}
+    for bone_data in template['bones']:
+        bone = armature_data.edit_bones.new(bone_data['name'])
+        bone.head = bone_data['head']
+        bone.tail = bone_data['tail']
+        bones[bone_data['name']] = bone
+
+    for bone_data in template['bones']:
+        if bone_data['parent']:
+            bones[bone_data['name']].parent = bones[bone_data['parent']]
+
+    parent = bones[template['bones'][0]['name']]
+    for index in range(extra_bones):
+        bone = armature_data.edit_bones.new(f"Extra{index:03d}")
+        bone.head = parent.tail
+        bone.tail = parent.tail + (parent.tail - parent.head).normalized() * 0.05
+        bone.parent = parent
+        parent = bone
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+    return armature
+
+
+def get_passthrough_node_group():
+    node_group = bpy.data.node_groups.get("BenchmarkPassthrough")
+    if node_group:
+        return node_group
+
+    node_group = bpy.data.node_groups.new("BenchmarkPassthrough", 'GeometryNodeTree')
+    node_group.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    node_group.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    group_input = node_group.nodes.new('NodeGroupInput')
+    group_output = node_group.nodes.new('NodeGroupOutput')
+    node_group.links.new(group_input.outputs[0], group_output.inputs[0])
+    return node_group
+
+
+def add_modifier(obj, modifier_type, armature):
+    if modifier_type == 'ARMATURE':
+        obj.modifiers.new("Armature", 'ARMATURE').object = armature
+    elif modifier_type == 'SUBSURF':
+        mod = obj.modifiers.new("Subdivision", 'SUBSURF')
+        mod.levels = 1
+    elif modifier_type == 'MIRROR':
+        obj.modifiers.new("Mirror", 'MIRROR')
+    elif modifier_type == 'DECIMATE':
+        obj.modifiers.new("Decimate", 'DECIMATE').ratio = 0.5
+    elif modifier_type == 'NODES':
+        obj.modifiers.new("GeometryNodes", 'NODES').node_group = get_passthrough_node_group()
+    elif modifier_type != 'NONE':
+        obj.modifiers.new(modifier_type.title(), modifier_type)
+
+
+def add_grid_mesh(name, tris, offset):
+    """Create a grid mesh object with roughly the requested number of triangles."""
+    quads = max(1, tris // 2)
+    nx = max(1, int(math.sqrt(quads)))
+    ny = max(1, quads // nx)
+
+    verts = [(offset + x / nx, y / ny, 1.0) for y in range(ny + 1) for x in range(nx + 1)]
+    faces = [
+        (y * (nx + 1) + x, y * (nx + 1) + x + 1, (y + 1) * (nx + 1) + x + 1, (y + 1) * (nx + 1) + x)
+        for y in range(ny) for x in range(nx)
+    ]
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update()
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def add_shape_keys(obj, count):
+    if not count:
+        return
+
+    obj.shape_key_add(name="Basis")
+    coords = [0.0] * (len(obj.data.vertices) * 3)
+    obj.data.vertices.foreach_get('co', coords)
+
+    for index in range(count):
+        key_block = obj.shape_key_add(name=f"Key{index:02d}", from_mix=False)
+        shifted = [value + 0.01 * (index + 1) if axis == 2 else value for value, axis in zip(coords, itertools.cycle(range(3)))]
+        key_block.data.foreach_set('co', shifted)
+
+
+def build_avatar(object_count, tris, modifiers, shape_keys, armature_type, extra_bones):
+    armature = add_armature(armature_type, extra_bones)
+    bone_names = [bone.name for bone in armature.data.bones]
+
+    for index in range(object_count):
+        obj = add_grid_mesh(f"Part{index:03d}", tris, index * 1.1)
+        obj.parent = armature
+
+        vertex_group = obj.vertex_groups.new(name=bone_names[index % len(bone_names)])
+        vertex_group.add(range(len(obj.data.vertices)), 1.0, 'REPLACE')
+
+        add_modifier(obj, 'ARMATURE', armature)
+        add_modifier(obj, modifiers[index % len(modifiers)], armature)
+        add_shape_keys(obj, shape_keys)
+
+        material = bpy.data.materials.get(f"Material{index % 4}") or bpy.data.materials.new(f"Material{index % 4}")
+        obj.data.materials.append(material)
+
+    bpy.context.view_layer.update()
+    return armature
+
+
+def clear_scene():
+    bpy.data.batch_remove(
+        list(bpy.data.objects) + list(bpy.data.meshes) + list(bpy.data.armatures)
+        + list(bpy.data.shape_keys) + list(bpy.data.materials)
+    )
+    utils.clear_stats_cache()
+
+
+# ----------------- Panel Drawing -----------------
+
+class RecordingLayout:
+    """Stand-in for UILayout which accepts every call and counts the drawn items."""
+
+    def __init__(self, counter=None):
+        self._counter = counter if counter is not None else [0]
+
+    def _sub_layout(self, *args, **kwargs):
+        return RecordingLayout(self._counter)
+
+    row = column = box = split = grid_flow = column_flow = _sub_layout
+
+    def operator(self, *args, **kwargs):
+        self._counter[0] += 1
+        return type("OperatorProperties", (), {})()
+
+    def __getattr__(self, name):
+        def draw_item(*args, **kwargs):
+            self._counter[0] += 1
+        return draw_item
+
+    @property
+    def item_count(self):
+        return self._counter[0]
+
+
+def make_panel_stub(panel_class):
+    """Return an object whose methods are the panel's, so draw() runs without a UI region."""
+    methods = {name: value for name, value in vars(panel_class).items() if callable(value)}
+    stub = type(f"{panel_class.__name__}Stub", (), methods)()
+    stub.layout = RecordingLayout()
+    return stub
+
+
+# ----------------- Timing -----------------
+
+def time_call(function, repeat=1, before=None):
+    """Return the median and minimum run time of a call in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples)}
+
+
+def run_case(case, repeat):
+    armature = build_avatar(case["objects"], case["tris"], case["modifiers"], case["shape_keys"],
+                            case["armature"], case["bones"])
+    scene = bpy.context.scene
+    scene.selected_armature = armature.data
+    scene.rating_mode = 'ARMATURE'
+
+    stats = utils.get_performance_stats(armature.name, 'ARMATURE')
+    panel = make_panel_stub(panels.STATS_PT_panel)
+
+    timings = {
+        "armature_cold": time_call(lambda: utils.get_performance_stats(armature.name, 'ARMATURE'), repeat, utils.clear_stats_cache),
+        "armature_warm": time_call(lambda: utils.get_performance_stats(armature.name, 'ARMATURE'), repeat),
+        "scene_cold": time_call(lambda: utils.get_performance_stats(None, 'SCENE'), repeat, utils.clear_stats_cache),
+        "scene_warm": time_call(lambda: utils.get_performance_stats(None, 'SCENE'), repeat),
+        "all_armatures_warm": time_call(utils.get_all_armature_stats, repeat),
+        "panel_draw_cold": time_call(lambda: panel.draw(bpy.context), repeat, utils.clear_stats_cache),
+        "panel_draw_warm": time_call(lambda: panel.draw(bpy.context), repeat),
+    }
+
+    result = dict(case, stats=stats, timings=timings, cache=utils.get_stats_cache_info())
+    clear_scene()
+    return result
+
+
+# ----------------- Reporting -----------------
+
+def case_id(case):
+    return f"{case['objects']}obj_{case['tris']}tris_{case['shape_keys']}keys"
+
+
+def compare(results, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {case_id(case): case for case in json.load(f)["cases"]}
+
+    print(f"{'case':<32}{'timing':<22}{'before':>10}{'after':>10}{'ratio':>8}")
+    for case in results:
+        old = previous.get(case_id(case))
+        if old is None:
+            continue
+        for name, timing in case["timings"].items():
+            if name not in old["timings"]:
+                continue
+            before = old["timings"][name]["median_ms"]
+            after = timing["median_ms"]
+            ratio = after / before if before else float('inf')
+            print(f"{case_id(case):<32}{name:<22}{before:>10.3f}{after:>10.3f}{ratio:>8.2f}")
+
+
+def parse_list(value, cast=int):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog="blender -b --python benchmark.py --")
+    parser.add_argument("--objects", default="10,60", help="Comma separated object counts")
+    parser.add_argument("--tris", default="1000,20000", help="Comma separated triangles per object")
+    parser.add_argument("--modifiers", default="NONE,SUBSURF,MIRROR,DECIMATE,NODES",
+                        help="Modifier types assigned round-robin to the objects, next to their Armature modifier")
+    parser.add_argument("--shape-keys", default="0,20", help="Comma separated shape key counts per object")
+    parser.add_argument("--armature", default="Extended", choices=["Basic", "Extended", "Digitigrade"])
+    parser.add_argument("--bones", type=int, default=0, help="Extra bones added to the armature template")
+    parser.add_argument("--repeat", type=int, default=20, help="Samples per timing")
+    parser.add_argument("--output", default="dogs_benchmark.json")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    cases = [
+        {
+            "objects": objects,
+            "tris": tris,
+            "modifiers": parse_list(args.modifiers, str),
+            "shape_keys": shape_keys,
+            "armature": args.armature,
+            "bones": args.bones,
+        }
+        for objects, tris, shape_keys in itertools.product(
+            parse_list(args.objects), parse_list(args.tris), parse_list(args.shape_keys)
+        )
+    ]
+
+    clear_scene()
+
+    results = []
+    for case in cases:
+        result = run_case(case, args.repeat)
+        results.append(result)
+        warm = result["timings"]["panel_draw_warm"]["median_ms"]
+        cold = result["timings"]["panel_draw_cold"]["median_ms"]
+        print(f"{case_id(case)}: panel draw {cold:.2f} ms cold, {warm:.3f} ms warm")
+
+    report = {
+        "blender": bpy.app.version_string,
+        "addon_version": list(addon.bl_info["version"]),
+        "cases": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=list)
+    print(f"Results written to '{args.output}'.")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    addon = load_addon()
+    utils = addon.utils
+    panels = addon.panels
+    main()
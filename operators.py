@@ -1,11 +1,12 @@
 # operators.py
 
 import bpy
-from bpy.props import StringProperty
+from bpy.props import StringProperty, BoolProperty
 
 from . import utils
 from mathutils import Vector
 import bmesh
+import numpy as np
 from bpy_extras.view3d_utils import region_2d_to_origin_3d, region_2d_to_vector_3d
 
 class SimpleExportOperator(bpy.types.Operator):
@@ -107,6 +108,20 @@ class OBJECT_OT_DistributeAlongAxisWithMirrors(bpy.types.Operator):
         max=1000.0,
     ) # type: ignore
 
+    arrangement: bpy.props.EnumProperty(
+        name="Arrangement",
+        description="How the objects are laid out",
+        items=[('LINE', "Line", "Place the objects one after another along the axis"),
+               ('PACK', "Pack", "Pack the objects into a compact grid on the plane of the axis and the remaining non-mirror axis")],
+        default='LINE'
+    ) # type: ignore
+
+    set_origin: bpy.props.BoolProperty(
+        name="Set Origins",
+        description="Move the origin of every object to the center of its bounds",
+        default=True,
+    ) # type: ignore
+
     @classmethod
     def poll(cls, context):
         if context.mode != 'OBJECT':
@@ -123,18 +138,15 @@ class OBJECT_OT_DistributeAlongAxisWithMirrors(bpy.types.Operator):
     def execute(self, context):
         selected_objects = context.selected_objects
 
-        # Set the origin of each object to its bounding box center
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in selected_objects:
-            obj.select_set(True)
-            context.view_layer.objects.active = obj
-            bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
-            obj.select_set(False)
+        # World bounds of all objects at once, their centers stand in for the origins
+        corners = utils.bound_box_corners(selected_objects)
+        mins, maxs = utils.world_bounds(selected_objects, corners)
+        centers = (mins + maxs) / 2
 
-        # Re-select all objects
-        for obj in selected_objects:
-            obj.select_set(True)
-        context.view_layer.objects.active = selected_objects[0]
+        # Set the origin of each object to its bounding box center, without an operator call per object.
+        # The world bounds stay the same, so they don't need to be read again.
+        if self.set_origin:
+            utils.set_origins_to_bounds(selected_objects, corners)
 
         # Axis indices for distribution and mirror checking
         axis_index = {'X': 0, 'Y': 1, 'Z': 2}[self.axis]
@@ -144,62 +156,71 @@ class OBJECT_OT_DistributeAlongAxisWithMirrors(bpy.types.Operator):
         mirror_axis_index = {'X': 0, 'Y': 1, 'Z': 2}[mirror_axis]
 
         # Group objects with their mirrored counterparts
-        grouped_objects = []
-        processed_objects = set()
-
-        for obj in selected_objects:
-            if obj in processed_objects:
-                continue
-            
-            # Find a mirrored counterpart, if any
-            mirrored_obj = next(
-                (other for other in selected_objects 
-                 if other != obj and 
-                 round(other.location[mirror_axis_index], 4) == -round(obj.location[mirror_axis_index], 4) and
-                 round(other.location[axis_index], 4) == round(obj.location[axis_index], 4)),
-                None
-            )
-
-            if mirrored_obj:
-                # Add the pair as a group
-                grouped_objects.append([obj, mirrored_obj])
-                processed_objects.update({obj, mirrored_obj})
-            else:
-                # Add as a single object group
-                grouped_objects.append([obj])
-                processed_objects.add(obj)
+        grouped_objects = utils.find_mirror_pairs(centers, axis_index, mirror_axis_index)
 
         # **Sort the groups along the selected axis**
         def get_group_sort_key(group):
             # Use the minimum position along the axis of the group
-            min_val = min((obj.location[axis_index] for obj in group))
-            return min_val
+            return centers[group, axis_index].min()
 
         grouped_objects.sort(key=get_group_sort_key)
 
-        # Arrange each group along the selected axis
-        current_position = 0.0
+        # Bounds of every group
+        group_mins = np.array([mins[group].min(axis=0) for group in grouped_objects])
+        group_maxs = np.array([maxs[group].max(axis=0) for group in grouped_objects])
 
-        for group in grouped_objects:
-            # Calculate bounding box size for the entire group along the selected axis
-            min_val = min((obj.matrix_world @ Vector(corner))[axis_index] for obj in group for corner in obj.bound_box)
-            max_val = max((obj.matrix_world @ Vector(corner))[axis_index] for obj in group for corner in obj.bound_box)
-            group_size = max_val - min_val
+        if self.arrangement == 'PACK':
+            # Pack on the plane of the axis and the axis that isn't the mirror one, mirror pairs stay symmetric
+            plane = [axis_index, 3 - axis_index - mirror_axis_index]
+            positions = utils.shelf_pack(group_maxs[:, plane] - group_mins[:, plane], self.margin)
+        else:
+            # Arrange each group along the selected axis, including margin
+            plane = [axis_index]
+            group_sizes = group_maxs[:, axis_index] - group_mins[:, axis_index] + self.margin
+            positions = (np.cumsum(group_sizes) - group_sizes)[:, None]
+
+        # Move each object in the group by the same amount to keep them aligned
+        deltas = np.zeros((len(grouped_objects), 3))
+        deltas[:, plane] = positions - group_mins[:, plane]
+        for group, delta in zip(grouped_objects, deltas.tolist()):
+            for i in group:
+                utils.offset_object(selected_objects[i], Vector(delta))
+
+        return {'FINISHED'}
 
-            # Move each object in the group by the same amount to keep them aligned
-            delta = current_position - min_val
-            for obj in group:
-                obj.location[axis_index] += delta
 
-            # Update the position for the next group, including margin
-            current_position += group_size + self.margin
+class OBJECT_OT_RestoreDistributedObjects(bpy.types.Operator):
+    """Move the selected objects back to where they were before they were distributed"""
+    bl_idname = "object.restore_distributed_objects"
+    bl_label = "Restore Positions"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        if context.mode != 'OBJECT':
+            cls.poll_message_set("The current mode is not Object mode.")
+            return False
+        if not any(utils.LAYOUT_OFFSET_PROPERTY in obj for obj in context.selected_objects):
+            cls.poll_message_set("No distributed objects selected.")
+            return False
+        return True
 
+    def execute(self, context):
+        restored = sum(utils.restore_layout_offset(obj) for obj in context.selected_objects)
+        self.report({'INFO'}, f"Restored {restored} objects.")
         return {'FINISHED'}
 
 class OBJECT_OT_show_ngons(bpy.types.Operator):
     """Select faces that have more than 4 edges in the mesh objects"""
     bl_idname = "object.show_ngons"
     bl_label = "Ngons"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    select: BoolProperty(
+        name="Select",
+        description="Select the found faces and deselect everything else",
+        default=True
+    )
     
     @classmethod
     def poll(cls, context):
@@ -214,43 +235,30 @@ class OBJECT_OT_show_ngons(bpy.types.Operator):
                 cls.poll_message_set("All selected objects must be meshes.")
                 return False
         
-        # Check if we are in Edit Mode
-        if context.object.mode != 'EDIT':
-            cls.poll_message_set("To use this function, you need to be in Edit Mode.")
-            return False
-        
         # All conditions are met
         return True
     
     def execute(self, context):
-        
-        total_selected_faces = 0  # To store the total number of selected Ngons across all objects
-        
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                # Ensure the object is the active one
-                context.view_layer.objects.active = obj
+        in_edit_mode = context.mode == 'EDIT_MESH'
 
-                # Get the mesh data in Edit Mode
-                mesh = bmesh.from_edit_mesh(obj.data)
-
-                # Deselect all faces first
-                bpy.ops.mesh.select_all(action='DESELECT')
-
-                bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='FACE')
+        # Mesh arrays are only up to date outside of Edit Mode, one switch covers all objects
+        if in_edit_mode:
+            bpy.ops.object.mode_set(mode='OBJECT')
 
-                # Select faces with more than 4 sides (Ngons)
-                bpy.ops.mesh.select_face_by_sides(number=4, type='GREATER')
+        histograms = utils.find_faces_by_size(context.selected_objects, 'NGONS', self.select)
 
-                # Count selected faces
-                num_selected_faces = len([f for f in mesh.faces if f.select])
-                total_selected_faces += num_selected_faces
+        if in_edit_mode:
+            bpy.ops.object.mode_set(mode='EDIT')
+            if self.select:
+                context.tool_settings.mesh_select_mode = (False, False, True)
 
-                # Update the mesh in edit mode
-                bmesh.update_edit_mesh(obj.data)
+        for name, histogram in histograms.items():
+            if histogram['NGONS']:
+                self.report({'INFO'}, f"{name}: Tris {histogram['TRIS']}, Quads {histogram['QUADS']}, Ngons {histogram['NGONS']}")
 
-        if total_selected_faces > 0:
-            self.report({'INFO'}, f"Found Ngons: {total_selected_faces}")
+        total_found = sum(histogram['NGONS'] for histogram in histograms.values())
+        if total_found > 0:
+            self.report({'INFO'}, f"Found Ngons: {total_found}")
         else:
             self.report({'INFO'}, "No Ngons found in selected objects!")
 
@@ -260,7 +268,14 @@ class OBJECT_OT_show_triangles(bpy.types.Operator):
     """Select faces that have exactly 3 edges in the mesh objects"""
     bl_idname = "object.show_triangles"
     bl_label = "Select Triangles"
+    bl_options = {'REGISTER', 'UNDO'}
 
+    select: BoolProperty(
+        name="Select",
+        description="Select the found faces and deselect everything else",
+        default=True
+    )
+    
     @classmethod
     def poll(cls, context):
         # Check if any objects are selected
@@ -274,45 +289,313 @@ class OBJECT_OT_show_triangles(bpy.types.Operator):
                 cls.poll_message_set("All selected objects must be meshes.")
                 return False
         
-        # Check if we are in Edit Mode
-        if context.object.mode != 'EDIT':
-            cls.poll_message_set("To use this function, you need to be in Edit Mode.")
-            return False
-        
         # All conditions are met
         return True
     
     def execute(self, context):
-        total_selected_faces = 0  # To store the total number of selected triangles across all objects
+        in_edit_mode = context.mode == 'EDIT_MESH'
+
+        # Mesh arrays are only up to date outside of Edit Mode, one switch covers all objects
+        if in_edit_mode:
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        histograms = utils.find_faces_by_size(context.selected_objects, 'TRIS', self.select)
+
+        if in_edit_mode:
+            bpy.ops.object.mode_set(mode='EDIT')
+            if self.select:
+                context.tool_settings.mesh_select_mode = (False, False, True)
+
+        for name, histogram in histograms.items():
+            if histogram['TRIS']:
+                self.report({'INFO'}, f"{name}: Tris {histogram['TRIS']}, Quads {histogram['QUADS']}, Ngons {histogram['NGONS']}")
+
+        total_found = sum(histogram['TRIS'] for histogram in histograms.values())
+        if total_found > 0:
+            self.report({'INFO'}, f"Found triangles: {total_found}")
+        else:
+            self.report({'INFO'}, "No triangles found in selected objects!")
+
+        return {'FINISHED'}
+
+class OBJECT_OT_ScanMeshHealth(bpy.types.Operator):
+    """Find duplicate vertices, zero area faces, loose vertices and edges, non-manifold edges and degenerate UVs in the mesh objects"""
+    bl_idname = "object.scan_mesh_health"
+    bl_label = "Mesh Health"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    select: BoolProperty(
+        name="Select",
+        description="Select the offending elements and deselect everything else",
+        default=True
+    )
+
+    merge_distance: bpy.props.FloatProperty(
+        name="Merge Distance",
+        description="Vertices within this distance of each other count as duplicates",
+        default=0.0001,
+        min=0.000001,
+        max=1.0,
+        precision=6,
+    ) # type: ignore
+    
+    @classmethod
+    def poll(cls, context):
+        # Check if any objects are selected
+        if not context.selected_objects:
+            cls.poll_message_set("No objects selected.")
+            return False
         
+        # Check if all selected objects are meshes
         for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                # Ensure the object is the active one
-                context.view_layer.objects.active = obj
+            if obj.type != 'MESH':
+                cls.poll_message_set("All selected objects must be meshes.")
+                return False
+        
+        # All conditions are met
+        return True
+    
+    def execute(self, context):
+        # There may be no active object, context.mode doesn't need one
+        in_edit_mode = context.mode == 'EDIT_MESH'
 
-                # Get the mesh data in Edit Mode
-                mesh = bmesh.from_edit_mesh(obj.data)
+        # Mesh arrays are only up to date outside of Edit Mode, one switch covers all objects
+        if in_edit_mode:
+            bpy.ops.object.mode_set(mode='OBJECT')
 
-                # Deselect all faces first
-                bpy.ops.mesh.select_all(action='DESELECT')
-                
-                bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='FACE')
+        results = utils.scan_objects_health(context.selected_objects, self.select, self.merge_distance)
+
+        if in_edit_mode:
+            bpy.ops.object.mode_set(mode='EDIT')
+
+        total_found = 0
+        for name, counts in results.items():
+            problems = [f"{count} {utils.HEALTH_CHECKS[check]}" for check, count in counts.items() if count]
+            if problems:
+                self.report({'WARNING'}, f"{name}: {', '.join(problems)}")
+            total_found += sum(counts.values())
+
+        if total_found > 0:
+            self.report({'WARNING'}, f"Found problems: {total_found} in {sum(1 for counts in results.values() if any(counts.values()))} objects")
+        else:
+            self.report({'INFO'}, "No problems found in selected objects!")
+
+        return {'FINISHED'}
+
+# Operator fitting the rated meshes into a triangle budget with Decimate modifiers
+class OBJECT_OT_AllocateTriangleBudget(bpy.types.Operator):
+    """Add Decimate modifiers to the rated meshes so their triangles fit the limit of the target rating"""
+    bl_idname = "object.allocate_triangle_budget"
+    bl_label = "Fit Triangle Budget"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    target_rating: bpy.props.EnumProperty(
+        name="Target Rating",
+        description="Rating whose triangle limit of the current device mode should be met",
+        items=[('Good', "Good", ""),
+               ('Medium', "Medium", "")],
+        default='Good'
+    ) # type: ignore
+
+    weighting: bpy.props.EnumProperty(
+        name="Weighting",
+        description="How the budget is shared between the meshes",
+        items=[('SIZE', "Size", "Every mesh keeps the same share of its triangles"),
+               ('PRIORITY', "Priority", "Meshes with a higher Triangle Priority keep more of their triangles")],
+        default='SIZE'
+    ) # type: ignore
 
-                # Select faces with exactly 3 sides (triangles)
-                bpy.ops.mesh.select_face_by_sides(number=3, type='EQUAL')
+    min_ratio: bpy.props.FloatProperty(
+        name="Minimum Ratio",
+        description="No mesh is decimated below this share of its triangles",
+        default=0.1,
+        min=0.01,
+        max=1.0,
+    ) # type: ignore
+
+    max_iterations: bpy.props.IntProperty(
+        name="Max Iterations",
+        description="How often the ratios may be corrected after measuring the result",
+        default=4,
+        min=1,
+        max=20,
+    ) # type: ignore
 
-                # Count selected faces
-                num_selected_faces = len([f for f in mesh.faces if f.select])
-                total_selected_faces += num_selected_faces
+    @classmethod
+    def poll(cls, context):
+        if context.mode != 'OBJECT':
+            cls.poll_message_set("The current mode is not Object mode.")
+            return False
+        if context.scene.rating_mode != 'SCENE' and not context.scene.selected_armature:
+            cls.poll_message_set("No Avatar Armature Selected!")
+            return False
+        return True
+
+    def get_object_tris(self, context):
+        scene = context.scene
+        armature_name = scene.selected_armature.name if scene.selected_armature else None
+        # All armatures can't share one budget, so the selected one is used
+        rating_mode = 'ARMATURE' if scene.rating_mode == 'ALL' else scene.rating_mode
+
+        stats = utils.get_performance_stats(armature_name, rating_mode, breakdown=True)
+        if stats is None:
+            return {}
+        return {row["name"]: row["tri_count"] for row in stats["objects"]}
+
+    def execute(self, context):
+        limit = utils.RATING_THRESHOLDS[context.scene.device_mode][self.target_rating]["tri_count"]
 
-                # Update the mesh in edit mode
-                bmesh.update_edit_mesh(obj.data)
+        # Measure the meshes without the Decimate modifiers of a previous run
+        objects = [bpy.data.objects[name] for name in self.get_object_tris(context)]
+        for obj in objects:
+            utils.set_decimate_ratio(obj, 1.0)
 
-        if total_selected_faces > 0:
-            self.report({'INFO'}, f"Found triangles: {total_selected_faces}")
+        object_tris = self.get_object_tris(context)
+        counts = np.array([object_tris[obj.name] for obj in objects], dtype=np.float64)
+
+        if counts.sum() <= limit:
+            self.report({'INFO'}, f"Already within the budget: {int(counts.sum())} of {limit} triangles.")
+            return {'FINISHED'}
+
+        if self.weighting == 'PRIORITY':
+            weights = counts * np.array([obj.triangle_priority for obj in objects])
         else:
-            self.report({'INFO'}, "No triangles found in selected objects!")
+            weights = counts
+
+        targets = utils.allocate_triangle_budget(counts, weights, limit, counts * self.min_ratio)
+        ratios = np.divide(targets, counts, out=np.ones_like(counts), where=counts > 0)
+        predicted = int(targets.sum())
+
+        # Decimate only hits the ratio roughly, so correct the ratios by the measured result until it fits
+        for iteration in range(1, self.max_iterations + 1):
+            for obj, ratio in zip(objects, ratios.tolist()):
+                utils.set_decimate_ratio(obj, ratio)
+
+            object_tris = self.get_object_tris(context)
+            achieved = np.array([object_tris[obj.name] for obj in objects], dtype=np.float64)
+            if achieved.sum() <= limit:
+                break
+
+            over = achieved > targets
+            ratios[over] *= targets[over] / achieved[over]
+            ratios = np.clip(ratios, self.min_ratio, 1.0)
+
+        message = f"Predicted {predicted} triangles, achieved {int(achieved.sum())} of {limit} after {iteration} passes."
+        if achieved.sum() > limit:
+            self.report({'WARNING'}, message + " Lower the Minimum Ratio to fit the budget.")
+        else:
+            self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+# Operator merging the materials of the selected meshes into one with a texture atlas
+class OBJECT_OT_BuildTextureAtlas(bpy.types.Operator):
+    """Pack the base color textures of the selected meshes' materials into one atlas and replace the materials with a single one"""
+    bl_idname = "object.build_texture_atlas"
+    bl_label = "Build Texture Atlas"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    atlas_name: StringProperty(
+        name="Name",
+        description="Name of the atlas image and material",
+        default="Atlas"
+    ) # type: ignore
+
+    padding: bpy.props.IntProperty(
+        name="Padding",
+        description="Pixels around every texture filled with its border color",
+        default=4,
+        min=0,
+        max=64,
+    ) # type: ignore
+
+    max_size: bpy.props.IntProperty(
+        name="Max Size",
+        description="Largest side of the atlas in pixels, larger atlases are scaled down",
+        default=4096,
+        min=256,
+        max=16384,
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        if context.mode != 'OBJECT':
+            cls.poll_message_set("The current mode is not Object mode.")
+            return False
+        if not any(obj.type == 'MESH' for obj in context.selected_objects):
+            cls.poll_message_set("No mesh objects selected.")
+            return False
+        return True
+
+    def execute(self, context):
+        objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
 
+        material, merged = utils.build_texture_atlas(objects, self.atlas_name, self.padding, self.max_size)
+        if material is None:
+            self.report({'WARNING'}, "Need at least two materials with a Principled BSDF to build an atlas.")
+            return {'CANCELLED'}
+
+        image = utils.get_base_color_image(material)
+        self.report({'INFO'}, f"Merged {len(merged)} materials into '{material.name}' with a {image.size[0]}x{image.size[1]} atlas.")
+        return {'FINISHED'}
+
+# Operator removing shape keys that do nothing from the meshes of the avatar
+class OBJECT_OT_PruneShapeKeys(bpy.types.Operator):
+    """Remove shape keys that don't move any vertex and merge near-duplicate ones on all meshes of the selected armature"""
+    bl_idname = "object.prune_shape_keys"
+    bl_label = "Prune Shape Keys"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    threshold: bpy.props.FloatProperty(
+        name="Threshold",
+        description="Largest vertex offset that still counts as no change",
+        default=0.0001,
+        min=0.0,
+        max=0.1,
+        precision=5,
+    ) # type: ignore
+
+    merge_duplicates: BoolProperty(
+        name="Merge Duplicates",
+        description="Remove keys that match an earlier key and move their drivers and animation over to it",
+        default=True
+    )
+
+    keep_patterns: StringProperty(
+        name="Keep",
+        description="Comma separated name patterns of keys that are kept even if they do nothing, like visemes the avatar setup expects",
+        default="vrc.*"
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        if context.mode != 'OBJECT':
+            cls.poll_message_set("The current mode is not Object mode.")
+            return False
+        if not context.scene.selected_armature:
+            cls.poll_message_set("No Avatar Armature Selected!")
+            return False
+        return True
+
+    def execute(self, context):
+        armature = bpy.data.objects.get(context.scene.selected_armature.name)
+        if armature is None or armature.type != 'ARMATURE':
+            self.report({'WARNING'}, "The Avatar Armature has no object in the scene.")
+            return {'CANCELLED'}
+
+        objects = [obj for obj in utils.armature_index.get_dependents(context.scene, armature) if obj.type == 'MESH']
+        keep_patterns = [pattern.strip() for pattern in self.keep_patterns.split(",") if pattern.strip()]
+
+        results = utils.prune_shape_keys(objects, self.threshold, self.merge_duplicates, keep_patterns)
+
+        removed_count = 0
+        saved_bytes = 0
+        for mesh_name, (removed, saved) in results.items():
+            if removed:
+                self.report({'INFO'}, f"{mesh_name}: removed {', '.join(removed)}")
+            removed_count += len(removed)
+            saved_bytes += saved
+
+        self.report({'INFO'}, f"Removed {removed_count} shape keys from {len(results)} meshes, saving {saved_bytes / 1024:.0f} KB.")
         return {'FINISHED'}
 
 # Operator to join visible objects
@@ -357,17 +640,19 @@ class OBJECT_OT_JoinVisible(bpy.types.Operator):
             self.report({'WARNING'}, "No visible mesh objects to join.")
             return {'CANCELLED'}
 
-        # Select all visible mesh objects
-        for obj in visible_mesh_objects:
-            obj.select_set(True)
+        # Join into the active object if it is one of them, otherwise into the first one
+        target = context.view_layer.objects.active
+        if target not in visible_mesh_objects:
+            target = visible_mesh_objects[0]
 
-        # Set the active object to the first one in the list
-        context.view_layer.objects.active = visible_mesh_objects[0]
+        # Join the mesh arrays directly, bpy.ops.object.join gets slow with hundreds of parts
+        timings = utils.join_mesh_objects(target, visible_mesh_objects)
 
-        # Join all selected objects
-        bpy.ops.object.join()
+        target.select_set(True)
+        context.view_layer.objects.active = target
 
-        self.report({'INFO'}, f"Joined {len(visible_mesh_objects)} mesh objects.")
+        stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+        self.report({'INFO'}, f"Joined {len(visible_mesh_objects)} mesh objects ({stages}).")
         return {'FINISHED'}
 
 # Operator for separating by selection
@@ -419,34 +704,33 @@ class MESH_OT_SeparateByLooseParts(bpy.types.Operator):
     def execute(self, context):
         
         #I would love to use just bpy.ops.mesh.separate(type='LOOSE') but currently it breaks normals when used this issue was 
-        #reported 2022 not fixed to this day.
+        #reported 2022 not fixed to this day. So the parts are built directly from the mesh arrays instead,
+        #which keeps custom normals, UVs, vertex groups, shape keys and materials.
         
         # Check the current mode
-        initial_mode = bpy.context.active_object.mode
-        
-        # Ensure there is an active object and it is a mesh
-        active_object = bpy.context.active_object
-        if active_object is None or active_object.type != 'MESH':
-            print("No active mesh object selected.")
-            return
-
-        # If not already in Edit Mode, switch to Edit Mode
-        if initial_mode != 'EDIT':
-            bpy.ops.object.mode_set(mode='EDIT')
-        
-        # Select all geometry in Edit Mode
-        bpy.ops.mesh.select_all(action='SELECT')
-        
-        # Separate by loose parts
-        bpy.ops.mesh.separate(type='LOOSE')
-        
-        # Deselect all geometry
-        bpy.ops.mesh.select_all(action='DESELECT')
-        
-        # Switch back to Object Mode if it was the initial mode
-        if initial_mode != 'EDIT':
+        initial_mode = context.active_object.mode
+
+        # Separate every selected mesh, including the active one
+        objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if context.active_object not in objects:
+            objects.append(context.active_object)
+
+        # Mesh data is only up to date outside of Edit Mode
+        if initial_mode != 'OBJECT':
             bpy.ops.object.mode_set(mode='OBJECT')
 
+        part_count = 0
+        for obj in objects:
+            parts = utils.separate_loose_parts(obj)
+            for part in parts:
+                part.select_set(True)
+            part_count += len(parts)
+
+        # Switch back to Edit Mode if it was the initial mode
+        if initial_mode == 'EDIT':
+            bpy.ops.object.mode_set(mode='EDIT')
+
+        self.report({'INFO'}, f"Separated {len(objects)} objects into {part_count} loose parts.")
         return {'FINISHED'}
     
 # Operator for separating by materials
@@ -461,7 +745,30 @@ class MESH_OT_SeparateByMaterials(bpy.types.Operator):
         return context.object is not None and context.object.type == 'MESH'
 
     def execute(self, context):
-        bpy.ops.mesh.separate(type='MATERIAL')
+        # Check the current mode
+        initial_mode = context.active_object.mode
+
+        # Separate every selected mesh, including the active one
+        objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if context.active_object not in objects:
+            objects.append(context.active_object)
+
+        # Mesh data is only up to date outside of Edit Mode
+        if initial_mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        part_count = 0
+        for obj in objects:
+            parts = utils.separate_by_materials(obj)
+            for part in parts:
+                part.select_set(True)
+            part_count += len(parts)
+
+        # Switch back to Edit Mode if it was the initial mode
+        if initial_mode == 'EDIT':
+            bpy.ops.object.mode_set(mode='EDIT')
+
+        self.report({'INFO'}, f"Separated {len(objects)} objects into {part_count} parts by material.")
         return {'FINISHED'}
 
 class OBJECT_OT_toggle_pose_mode(bpy.types.Operator):
@@ -539,10 +846,19 @@ class OBJECT_OT_toggle_weight_paint_mode(bpy.types.Operator):
             ('ARMATURE_AUTO', "Automatic Weights", ""),
             ('ARMATURE_ENVELOPE', "Envelope Weights", ""),
             ('ARMATURE_NAME', "Empty Groups", ""),
+            ('ARMATURE_CAPSULE', "Fast Capsule Weights", "Weights by distance to the nearest bones, fast and works on non-manifold meshes"),
         ],
         default='ARMATURE_AUTO'
     )
 
+    max_influences: bpy.props.IntProperty(
+        name="Max Influences",
+        description="Most bones a vertex is weighted to with Fast Capsule Weights",
+        default=4,
+        min=1,
+        max=8
+    )
+
     def armature_items(self, context):
         armatures = [(arm.name, arm.name, "") for arm in bpy.data.objects if arm.type == 'ARMATURE']
         if not armatures:
@@ -632,6 +948,8 @@ class OBJECT_OT_toggle_weight_paint_mode(bpy.types.Operator):
             layout.label(text="Mesh is not parented to an armature.")
             layout.prop(self, "armature_to_parent", text="Armature to Parent")
             layout.prop(self, "parent_method", text="Parent Method")
+            if self.parent_method == 'ARMATURE_CAPSULE':
+                layout.prop(self, "max_influences")
 
         # 2) Armature with no child meshes or multiple child meshes
         elif obj.type == 'ARMATURE':
@@ -640,6 +958,8 @@ class OBJECT_OT_toggle_weight_paint_mode(bpy.types.Operator):
                 layout.label(text="No meshes parented to this armature.")
                 layout.prop(self, "mesh_to_paint")
                 layout.prop(self, "parent_method")
+                if self.parent_method == 'ARMATURE_CAPSULE':
+                    layout.prop(self, "max_influences")
             elif len(meshes) > 1:
                 layout.label(text="Multiple child meshes found. Select one:")
                 layout.prop(self, "mesh_to_paint")
@@ -838,7 +1158,12 @@ class OBJECT_OT_toggle_weight_paint_mode(bpy.types.Operator):
         armature.select_set(True)
         bpy.context.view_layer.objects.active = armature
 
-        bpy.ops.object.parent_set(type=self.parent_method)
+        if self.parent_method == 'ARMATURE_CAPSULE':
+            # Parent with empty groups, then fill them without going through bone heat
+            bpy.ops.object.parent_set(type='ARMATURE_NAME')
+            utils.bind_capsule_weights(mesh, armature, self.max_influences)
+        else:
+            bpy.ops.object.parent_set(type=self.parent_method)
 
     def get_object_under_cursor(self, context, event):
         """
@@ -891,7 +1216,32 @@ class WeightGradientOperator(bpy.types.Operator):
         default='LINEAR'
     )
 
+    distance_mode: bpy.props.EnumProperty(
+        name="Distance",
+        description="What the distance of the vertices is measured to",
+        items=[
+            ('CENTER', "Bone Center", "Sphere around the middle of the bone"),
+            ('CAPSULE', "Bone Segment", "Capsule along the whole bone from head to tail"),
+        ],
+        default='CENTER'
+    )
+
+    all_bones: bpy.props.BoolProperty(
+        name="All Deform Bones",
+        description="Build the gradient of every deform bone of the armature at once along the whole bones, replacing their vertex groups",
+        default=False,
+        options={'SKIP_SAVE'}
+    )
+
+    normalize: bpy.props.BoolProperty(
+        name="Normalize",
+        description="Make the weights of every vertex add up to one when building all bones",
+        default=True
+    )
+
     center_pos_obj: bpy.props.FloatVectorProperty(name="Bone Center", subtype='TRANSLATION')
+    head_pos_obj: bpy.props.FloatVectorProperty(name="Bone Head", subtype='TRANSLATION')
+    tail_pos_obj: bpy.props.FloatVectorProperty(name="Bone Tail", subtype='TRANSLATION')
 
     def invoke(self, context, event):
         obj = context.active_object
@@ -900,6 +1250,10 @@ class WeightGradientOperator(bpy.types.Operator):
             self.report({'ERROR'}, "You must be in Weight Paint mode to use this operator.")
             return {'CANCELLED'}
 
+        # All bones are looked up in execute
+        if self.all_bones:
+            return self.execute(context)
+
         # Get the active vertex group (assumed to correspond to the selected bone)
         vertex_group = obj.vertex_groups.active
         if vertex_group is None:
@@ -927,8 +1281,11 @@ class WeightGradientOperator(bpy.types.Operator):
         tail_pos_world = armature.matrix_world @ pose_bone.tail
         center_pos_world = (head_pos_world + tail_pos_world) / 2
 
-        # Store the bone center in object space
-        self.center_pos_obj = obj.matrix_world.inverted() @ center_pos_world
+        # Store the bone center, head and tail in object space
+        world_to_obj = obj.matrix_world.inverted()
+        self.center_pos_obj = world_to_obj @ center_pos_world
+        self.head_pos_obj = world_to_obj @ head_pos_world
+        self.tail_pos_obj = world_to_obj @ tail_pos_world
 
         # Place the 3D cursor at the bone center (for debugging)
         bpy.context.scene.cursor.location = center_pos_world
@@ -943,38 +1300,57 @@ class WeightGradientOperator(bpy.types.Operator):
             self.report({'ERROR'}, "You must be in Weight Paint mode to use this operator.")
             return {'CANCELLED'}
 
+        if self.all_bones:
+            return self.execute_all_bones(context)
+
         center_pos_obj = self.center_pos_obj
 
         mesh = obj.data
 
-        # Apply the gradient to each vertex in the mesh
-        for v in mesh.vertices:
-            v_co = v.co
-            distance = (v_co - center_pos_obj).length
+        # Distances and falloff of all vertices in one pass
+        positions = utils.read_array(mesh.vertices, 'co', 3)
+        if self.distance_mode == 'CAPSULE':
+            heads = np.array([self.head_pos_obj], dtype=np.float32)
+            tails = np.array([self.tail_pos_obj], dtype=np.float32)
+            distances = utils.segment_distances(positions, heads, tails)[:, 0]
+        else:
+            distances = np.linalg.norm(positions - np.array(center_pos_obj, dtype=np.float32), axis=1)
+        weights = utils.gradient_weights(distances, self.gradient_radius, self.gradient_strength, self.gradient_type)
 
-            if distance > self.gradient_radius:
-                weight = 0.0
-            else:
-                normalized_distance = distance / self.gradient_radius if self.gradient_radius > 0 else 0.0
-
-                if self.gradient_type == 'LINEAR':
-                    weight = self.gradient_strength * (1 - normalized_distance)
-                elif self.gradient_type == 'SMOOTH':
-                    weight = self.gradient_strength * ((math.cos(math.pi * normalized_distance) + 1) / 2)
-                elif self.gradient_type == 'CONSTANT':
-                    weight = self.gradient_strength
-                else:
-                    weight = 0.0
+        # Vertices with the same weight are written together
+        utils.write_group_weights(obj.vertex_groups.active, weights)
+
+        return {'FINISHED'}
 
-            weight = max(0.0, min(weight, 1.0))  # Clamp the weight between 0 and 1
+    def execute_all_bones(self, context):
+        obj = context.active_object
 
-            vertex_group = obj.vertex_groups.active
+        armature_mod = next((mod for mod in obj.modifiers if mod.type == 'ARMATURE'), None)
+        if armature_mod is None or armature_mod.object is None:
+            self.report({'ERROR'}, "Object has no valid Armature modifier.")
+            return {'CANCELLED'}
 
-            if weight > 0.0:
-                vertex_group.add([v.index], weight, 'REPLACE')
-            else:
-                vertex_group.remove([v.index])
+        armature = armature_mod.object
+        deform_bones = [bone for bone in armature.data.bones if bone.use_deform]
+        if not deform_bones:
+            self.report({'ERROR'}, "Armature has no deform bones.")
+            return {'CANCELLED'}
+
+        # Rest heads and tails in object space, the vertex coordinates are in rest pose too
+        armature_to_obj = np.array(obj.matrix_world.inverted() @ armature.matrix_world)
+        heads = utils.transform_points(np.array([bone.head_local for bone in deform_bones]), armature_to_obj)
+        tails = utils.transform_points(np.array([bone.tail_local for bone in deform_bones]), armature_to_obj)
+
+        # One chunked vertices x bones pass, always along the whole bone
+        positions = utils.read_array(obj.data.vertices, 'co', 3).astype(np.float64)
+        vertices, bones, weights = utils.bone_gradient_weights(
+            positions, heads, tails, self.gradient_radius, self.gradient_strength, self.gradient_type, self.normalize
+        )
 
+        # Replace the vertex groups of all deform bones
+        utils.replace_bone_weights(obj, [bone.name for bone in deform_bones], vertices, bones, weights)
+
+        self.report({'INFO'}, f"Weighted {len(deform_bones)} deform bones.")
         return {'FINISHED'}
 
 class ToggleWeightValue(bpy.types.Operator):
@@ -1064,8 +1440,8 @@ class OBJECT_OT_FindInfluencingBones(bpy.types.Operator):
 
         if context.mode == 'PAINT_WEIGHT':
             # Get selected vertices in weight paint mode with paint mask
-            vertex_indices = [v.index for v in obj.data.vertices if v.select]
-            if not vertex_indices:
+            vertex_mask = utils.read_array(obj.data.vertices, 'select', 1, bool)
+            if not vertex_mask.any():
                 self.report({'ERROR'}, "No vertices selected with the paint mask.")
                 return {'CANCELLED'}
 
@@ -1074,12 +1450,10 @@ class OBJECT_OT_FindInfluencingBones(bpy.types.Operator):
             return {'CANCELLED'}
 
 
-        # Get influencing vertex groups
-        vg_indices = set()
-        for v_idx in vertex_indices:
-            vg_indices.update(g.group for g in obj.data.vertices[v_idx].groups)
+        # Get influencing vertex groups from the cached weights
+        vg_indices = utils.influencing_groups(obj.data, vertex_mask)
 
-        if not vg_indices:
+        if not len(vg_indices):
             self.report({'INFO'}, "No influencing bones found.")
             return {'FINISHED'}
 
@@ -1089,27 +1463,76 @@ class OBJECT_OT_FindInfluencingBones(bpy.types.Operator):
             self.report({'ERROR'}, "No armature modifier found on the mesh.")
             return {'CANCELLED'}
 
-        # Deselect all bones and hide them
-        for bone in armature.pose.bones:
-            bone.bone.select = False
-            bone.bone.hide = True  # Hide all bones initially
-
         # Map vertex groups to bones
-        bone_names = [obj.vertex_groups[vg_idx].name for vg_idx in vg_indices if obj.vertex_groups[vg_idx].name in armature.data.bones]
+        group_names = {obj.vertex_groups[int(vg_idx)].name for vg_idx in vg_indices if vg_idx < len(obj.vertex_groups)}
+        bones = armature.data.bones
+        influencing = np.array([bone.name in group_names for bone in bones], dtype=bool)
 
-        if not bone_names:
+        # Select and unhide the bones influencing the selected vertices, hide and deselect all others
+        bones.foreach_set('select', influencing)
+        bones.foreach_set('hide', ~influencing)
+
+        # foreach_set skips the update callbacks of the properties, sync the evaluated armature by hand
+        armature.data.update_tag()
+        utils.tag_redraw_view3d()
+
+        bone_count = int(influencing.sum())
+        if not bone_count:
             self.report({'INFO'}, "No influencing bones found.")
             return {'FINISHED'}
 
-        # Select and unhide the bones influencing the selected vertices
-        for bone_name in bone_names:
-            bone = armature.pose.bones.get(bone_name)
-            if bone:
-                bone.bone.select = True
-                bone.bone.hide = False  # Unhide influencing bones
+        self.report({'INFO'}, f"This mesh is influanced by: {bone_count} Bones")
+        return {'FINISHED'}
+
+class OBJECT_OT_LimitBoneInfluences(bpy.types.Operator):
+    """Keep only the strongest bone weights of every vertex and normalize them, on all meshes bound to the selected armature"""
+    bl_idname = "object.limit_bone_influences"
+    bl_label = "Limit Influences"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_influences: bpy.props.IntProperty(
+        name="Max Influences",
+        description="Most bones a vertex may be weighted to, game engines like Unity use 4",
+        default=4,
+        min=1,
+        max=8
+    )
+
+    normalize: bpy.props.BoolProperty(
+        name="Normalize",
+        description="Make the bone weights of every vertex add up to one",
+        default=True
+    )
+
+    @classmethod
+    def poll(cls, context):
+        if context.mode not in {'OBJECT', 'PAINT_WEIGHT'}:
+            cls.poll_message_set("Must be in Object or Weight Paint mode.")
+            return False
+        if not context.scene.selected_armature:
+            cls.poll_message_set("No Avatar Armature Selected!")
+            return False
+        return True
+
+    def execute(self, context):
+        armature = bpy.data.objects.get(context.scene.selected_armature.name)
+        if armature is None or armature.type != 'ARMATURE':
+            self.report({'WARNING'}, "The Avatar Armature has no object in the scene.")
+            return {'CANCELLED'}
+
+        deform_names = {bone.name for bone in armature.data.bones if bone.use_deform}
+
+        # Every mesh sharing data is limited once
+        meshes = {}
+        for obj in utils.armature_index.get_dependents(context.scene, armature):
+            if obj.type == 'MESH':
+                meshes.setdefault(obj.data, obj)
 
+        changed = 0
+        for obj in meshes.values():
+            changed += utils.limit_bone_influences(obj, deform_names, self.max_influences, self.normalize)
 
-        self.report({'INFO'}, f"This mesh is influanced by: {len(bone_names)} Bones")
+        self.report({'INFO'}, f"Changed {changed} vertices in {len(meshes)} meshes.")
         return {'FINISHED'}
 
 class OBJECT_OT_TogglePaintMaskAndTool(bpy.types.Operator):
@@ -1404,8 +1827,13 @@ classes = [
     SimpleExportOperator,
     AddArmatureOperator,
     OBJECT_OT_DistributeAlongAxisWithMirrors,
+    OBJECT_OT_RestoreDistributedObjects,
     OBJECT_OT_show_ngons,
     OBJECT_OT_show_triangles,
+    OBJECT_OT_ScanMeshHealth,
+    OBJECT_OT_AllocateTriangleBudget,
+    OBJECT_OT_BuildTextureAtlas,
+    OBJECT_OT_PruneShapeKeys,
     OBJECT_OT_JoinVisible,
     MESH_OT_SeparateBySelection,
     MESH_OT_SeparateByLooseParts,
@@ -1415,6 +1843,7 @@ classes = [
     WeightGradientOperator,
     ToggleWeightValue,
     OBJECT_OT_FindInfluencingBones,
+    OBJECT_OT_LimitBoneInfluences,
     AssignVerticesToActiveGroup,
     OBJECT_OT_TogglePivotPoint,
     ARMATURE_OT_CopyBoneColorToCollection,
@@ -57,7 +57,19 @@ class STATS_PT_panel(Panel):
         device_mode = scene.device_mode
         rating_mode = scene.rating_mode
 
-        stats = utils.get_performance_stats(selected_armature_name, rating_mode)
+        breakdown = scene.show_stats_breakdown
+        unused_slots = scene.stats_report_unused_slots
+
+        if rating_mode == 'ALL':
+            # Every armature is rated in a single pass below
+            stats, progress = None, 1.0
+        elif scene.stats_background:
+            stats, progress = utils.get_performance_stats_progressive(
+                selected_armature_name, rating_mode, scene.stats_time_budget / 1000.0, breakdown, unused_slots
+            )
+        else:
+            stats = utils.get_performance_stats(selected_armature_name, rating_mode, breakdown, unused_slots)
+            progress = 1.0
 
 
 
@@ -94,6 +106,15 @@ class STATS_PT_panel(Panel):
         row.label(text=f"Rating for: ")
         row.prop(scene, 'rating_mode', expand=True)
 
+        row = box.row(align=True)
+        row.prop(scene, 'stats_background', text="Background", icon='SORTTIME')
+        sub = row.row(align=True)
+        sub.enabled = scene.stats_background
+        sub.prop(scene, 'stats_time_budget', text="Budget (ms)")
+
+        row = box.row(align=True)
+        row.prop(scene, 'stats_report_unused_slots', text="Report Unused Material Slots", icon='MATERIAL')
+
         box = box.box()
 
         #----------------- If no Armature -----------------
@@ -101,6 +122,10 @@ class STATS_PT_panel(Panel):
         if not selected_armature and rating_mode == 'ARMATURE':
             box.label(text="No Avatar Armature Selected!", icon="ERROR")
             return
+
+        if rating_mode == 'ALL':
+            self.draw_all_armatures(box, device_mode)
+            return
         
         thresholds = utils.RATING_THRESHOLDS[device_mode]
 
@@ -114,10 +139,107 @@ class STATS_PT_panel(Panel):
         box.label(text=f"Bones: {stats['bone_count']}", icon=bone_icon)
         box.label(text=f"Skinned Meshs: {stats['skinned_meshes']}", icon=skin_icon)
 
+        if unused_slots:
+            unused_count = sum(len(names) for names in stats["unused_slots"].values())
+            box.label(text=f"Unused Slots: {unused_count}", icon='ERROR' if unused_count else 'CHECKMARK')
+            for obj_name, names in stats["unused_slots"].items():
+                box.label(text=f"{obj_name}: {', '.join(names)}", icon='BLANK1')
+
+        if progress < 1.0:
+            box.label(text=f"Computing... {progress:.0%}", icon='SORTTIME')
+
 
         box = layout.box()
         rating = utils.get_rating(stats, device_mode)
-        box.label(text=f"Rating: {rating}")
+        if progress < 1.0:
+            box.label(text=f"Rating: {rating} (partial)")
+        else:
+            box.label(text=f"Rating: {rating}")
+        row = box.row(align=True)
+        row.operator("object.allocate_triangle_budget", text="Fit Triangle Budget", icon='MOD_DECIM')
+        row.operator("object.build_texture_atlas", text="Build Atlas", icon='TEXTURE')
+        box.operator("object.prune_shape_keys", text="Prune Shape Keys", icon='SHAPEKEY_DATA')
+
+        # ----------------- Breakdown -----------------
+
+        row = layout.row(align=True)
+        row.prop(scene, "show_stats_breakdown", text="Breakdown", icon='DOWNARROW_HLT' if breakdown else 'RIGHTARROW', emboss=False)
+
+        if breakdown:
+            self.draw_breakdown(layout, scene, stats, thresholds)
+
+    def draw_all_armatures(self, layout, device_mode):
+        results = utils.get_all_armature_stats()
+        if not results:
+            layout.label(text="No Armatures in the Scene!", icon="ERROR")
+            return
+
+        thresholds = utils.RATING_THRESHOLDS[device_mode]
+
+        for armature_name, stats in results:
+            box = layout.box()
+            box.label(text=armature_name, icon='ARMATURE_DATA')
+
+            row = box.row(align=True)
+            for key, label in (("tri_count", "Tris"), ("material_count", "Mats"), ("bone_count", "Bones"), ("skinned_meshes", "Skinned")):
+                icon = utils.get_icon(stats[key], [thresholds["Good"][key], thresholds["Medium"][key]])
+                row.label(text=f"{label}: {stats[key]}", icon=icon)
+
+            row = box.row(align=True)
+            row.label(text=f"PC: {stats['ratings']['PC']}")
+            row.label(text=f"Standalone: {stats['ratings']['STANDALONE']}")
+
+    def draw_breakdown(self, layout, scene, stats, thresholds):
+        good = thresholds["Good"]
+        tri_limits = [good["tri_count"], thresholds["Medium"]["tri_count"]]
+
+        sort_key = {
+            'TRIS': lambda row: -row["tri_count"],
+            'VERTICES': lambda row: -row["vertex_count"],
+            'MATERIALS': lambda row: -row["material_count"],
+            'NAME': lambda row: row["name"].lower(),
+        }[scene.stats_breakdown_sort]
+
+        # Per object
+        box = layout.box()
+        row = box.row(align=True)
+        row.label(text="Sort by:")
+        row.prop(scene, "stats_breakdown_sort", expand=True)
+
+        col = box.column(align=True)
+        header = col.row(align=True)
+        header.label(text="Object")
+        header.label(text="Tris")
+        header.label(text="Verts")
+        header.label(text="Mats")
+        header.label(text="Priority")
+
+        for obj_stats in sorted(stats["objects"], key=sort_key):
+            row = col.row(align=True)
+            # Highlight objects that on their own break the Good limits of the device
+            row.alert = obj_stats["tri_count"] > good["tri_count"] or obj_stats["material_count"] > good["material_count"]
+            row.label(text=obj_stats["name"], icon='MOD_ARMATURE' if obj_stats["skinned"] else 'MESH_DATA')
+            row.label(text=str(obj_stats["tri_count"]), icon=utils.get_icon(obj_stats["tri_count"], tri_limits))
+            row.label(text=str(obj_stats["vertex_count"]))
+            row.label(text=str(obj_stats["material_count"]))
+            obj = bpy.data.objects.get(obj_stats["name"])
+            if obj:
+                row.prop(obj, "triangle_priority", text="")
+            else:
+                row.label(text="")
+
+        # Per material
+        box = layout.box()
+        col = box.column(align=True)
+        header = col.row(align=True)
+        header.label(text="Material")
+        header.label(text="Tris")
+
+        for name, tris in sorted(stats["material_tris"].items(), key=lambda item: -item[1]):
+            row = col.row(align=True)
+            row.alert = tris > good["tri_count"]
+            row.label(text=name, icon='MATERIAL')
+            row.label(text=str(tris), icon=utils.get_icon(tris, tri_limits))
 
 # Panel for Mesh Editing
 class MESH_EDIT_PT_panel(Panel):
@@ -142,6 +264,7 @@ class MESH_EDIT_PT_panel(Panel):
         sub = box.row(align=True)
 
         sub.operator("object.distribute_along_axis_with_mirrors", text="Distribute Selected Objects", icon="GEOMETRY_NODES")    
+        sub.operator("object.restore_distributed_objects", text="", icon="LOOP_BACK")
 
         
         # ----------------- Mesh -----------------    
@@ -171,6 +294,7 @@ class MESH_EDIT_PT_panel(Panel):
         sub.label(text="Find:", icon="BORDERMOVE")
         sub.operator("object.show_ngons", text="Ngons")
         sub.operator("object.show_triangles", text="Triangels")
+        sub.operator("object.scan_mesh_health", text="Health")
         
         
         # ----------------- Normals -----------------
@@ -288,7 +412,11 @@ class WEIGHTPAINT_BONE_MODES_PT(bpy.types.Panel):
             box = layout.box()
             box_row = box.row(align=True)
             box_row.operator("object.vertex_group_clean", text="Clean Vertex", icon="TRASH")
+            box_row.operator("object.limit_bone_influences", text="Limit Influences", icon="MOD_VERTEX_WEIGHT")
+            box_row = box.row(align=True)
             box_row.operator("object.weight_gradient_operator", text="Spherical Gradient", icon="SURFACE_NCURVE")
+            op = box_row.operator("object.weight_gradient_operator", text="All Bones", icon="BONE_DATA")
+            op.all_bones = True
 
             # Bone Settings
             row = layout.row()
@@ -1,5 +1,5 @@
 import bpy
-from bpy.props import EnumProperty, BoolProperty, PointerProperty
+from bpy.props import EnumProperty, BoolProperty, PointerProperty, IntProperty, FloatProperty
 from . import utils
 
 def register():
@@ -38,11 +38,58 @@ def register():
         description="Rating for",
         items=[
             ('SCENE', "Scene", "While rating the performance takes in to accout all visible objects in the current scene", 'SCENE_DATA',1),
-            ('ARMATURE', "Armature", "While rating the performance takes in to accout only objects paranted to the selected avatar armature", 'ARMATURE_DATA',2)
+            ('ARMATURE', "Armature", "While rating the performance takes in to accout only objects paranted to the selected avatar armature", 'ARMATURE_DATA',2),
+            ('ALL', "All", "Rates every armature in the scene on both devices at once", 'OUTLINER_OB_ARMATURE',3)
         ],
         default='SCENE'
     )
 
+    bpy.types.Scene.stats_background = BoolProperty(
+        name="Background Stats",
+        description="Compute the stats in small slices in the background instead of blocking the UI",
+        default=False
+    )
+
+    bpy.types.Scene.stats_time_budget = IntProperty(
+        name="Time Budget",
+        description="Maximum time in milliseconds the background stats may block the UI per update",
+        default=20,
+        min=1,
+        max=500
+    )
+
+    bpy.types.Scene.show_stats_breakdown = BoolProperty(
+        name="Stats Breakdown",
+        description="Toggle to show or hide the per-object and per-material stats",
+        default=False
+    )
+
+    bpy.types.Scene.stats_breakdown_sort = EnumProperty(
+        name="Sort By",
+        description="Sort the per-object stats by",
+        items=[
+            ('TRIS', "Tris", "Sort by triangle count"),
+            ('VERTICES', "Verts", "Sort by vertex count"),
+            ('MATERIALS', "Mats", "Sort by material count"),
+            ('NAME', "Name", "Sort by object name"),
+        ],
+        default='TRIS'
+    )
+
+    bpy.types.Scene.stats_report_unused_slots = BoolProperty(
+        name="Report Unused Slots",
+        description="List materials that sit in a material slot but aren't used by any face",
+        default=False
+    )
+
+    bpy.types.Object.triangle_priority = FloatProperty(
+        name="Triangle Priority",
+        description="Share of the triangle budget this object gets compared to the others, 0 decimates it as far as allowed",
+        default=1.0,
+        min=0.0,
+        soft_max=10.0
+    )
+
     bpy.types.Scene.paint_through_mesh = bpy.props.BoolProperty(
         name="Paint Through Mesh",
         description="Enable or disable paint through mesh",
@@ -55,6 +102,12 @@ def unregister():
     del bpy.types.Scene.show_extra_armature_options
     del bpy.types.Scene.device_mode
     del bpy.types.Scene.rating_mode
+    del bpy.types.Scene.stats_background
+    del bpy.types.Scene.stats_time_budget
+    del bpy.types.Scene.show_stats_breakdown
+    del bpy.types.Scene.stats_breakdown_sort
+    del bpy.types.Scene.stats_report_unused_slots
+    del bpy.types.Object.triangle_priority
     del bpy.types.Scene.paint_through_mesh
     del bpy.types.Scene.selected_collection
 
@@ -1,4 +1,11 @@
 import bpy
+from bpy.app.handlers import persistent
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+import time
+
+import numpy as np
+from mathutils import Matrix, Vector
 
 
 def armature_items(self, context):
@@ -40,28 +47,418 @@ def collection_items(self, context):
 
     return items
 
-def get_performance_stats(armature_name, rating_mode):
+# ----------------- Stats Cache -----------------
 
-    tri_count = 0
-    material_set = set()
+class StatsCache:
+    """Bounded LRU cache of per-object stats entries with hit/miss counters."""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        # Evict the least recently used entries
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, object_uids=(), mesh_uids=()):
+        """Drop every entry belonging to one of the given objects or mesh datablocks."""
+        stale = [key for key in self._entries if key[0] in object_uids or key[1] in mesh_uids]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
+
+
+# Per-object results of the stats pass. Entries are keyed on the object, its mesh
+# datablock and a fingerprint of everything else that changes the evaluated mesh,
+# so switching rating mode, device mode or armature reuses earlier results.
+stats_cache = StatsCache()
+
+# Modifiers that never change the topology of the mesh they are applied to
+TOPOLOGY_PRESERVING_MODIFIERS = {
+    'ARMATURE', 'CAST', 'CORRECTIVE_SMOOTH', 'CURVE', 'DATA_TRANSFER', 'DISPLACE',
+    'HOOK', 'LAPLACIANDEFORM', 'LAPLACIANSMOOTH', 'LATTICE', 'MESH_DEFORM', 'NORMAL_EDIT',
+    'SHRINKWRAP', 'SIMPLE_DEFORM', 'SMOOTH', 'SURFACE_DEFORM', 'UV_PROJECT', 'UV_WARP',
+    'VERTEX_WEIGHT_EDIT', 'VERTEX_WEIGHT_MIX', 'VERTEX_WEIGHT_PROXIMITY', 'WARP', 'WAVE',
+    'WEIGHTED_NORMAL',
+}
+
+# RNA property types that make up a modifier fingerprint
+_FINGERPRINT_PROPERTY_TYPES = {'BOOLEAN', 'INT', 'FLOAT', 'ENUM', 'STRING', 'POINTER'}
+_FINGERPRINT_IGNORED_PROPERTIES = {'rna_type', 'name', 'show_expanded', 'is_active', 'is_override_data'}
+
+# Fingerprinted property identifiers per modifier type
+_modifier_fingerprint_properties = {}
+
+
+def _fingerprint_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bpy.types.ID):
+        return value.session_uid
+    if isinstance(value, set):
+        return tuple(sorted(value))
+    if isinstance(value, bpy.types.bpy_struct):
+        return None
+    try:
+        return tuple(value)
+    except TypeError:
+        return None
+
+
+def modifier_fingerprint(mod):
+    """Return a hashable snapshot of a modifier's settings."""
+    identifiers = _modifier_fingerprint_properties.get(mod.type)
+    if identifiers is None:
+        identifiers = tuple(
+            prop.identifier for prop in mod.bl_rna.properties
+            if prop.type in _FINGERPRINT_PROPERTY_TYPES
+            and not prop.is_readonly
+            and prop.identifier not in _FINGERPRINT_IGNORED_PROPERTIES
+        )
+        _modifier_fingerprint_properties[mod.type] = identifiers
+
+    fingerprint = [mod.type]
+    fingerprint.extend(_fingerprint_value(getattr(mod, identifier)) for identifier in identifiers)
+
+    # Geometry Nodes inputs are stored as ID properties on the modifier
+    if mod.type == 'NODES':
+        fingerprint.extend((key, _fingerprint_value(mod[key])) for key in mod.keys())
+
+    return tuple(fingerprint)
+
+
+def object_stats_key(obj):
+    """Cache key of a mesh object: its mesh, modifier stack, material slots and shape/edit state."""
+    mesh = obj.data
+    shape_keys = mesh.shape_keys
+
+    return (
+        obj.session_uid,
+        mesh.session_uid,
+        tuple(modifier_fingerprint(mod) for mod in obj.modifiers),
+        tuple(slot.material.session_uid if slot.material else 0 for slot in obj.material_slots),
+        (
+            shape_keys.session_uid if shape_keys else 0,
+            obj.active_shape_key_index,
+            obj.show_only_shape_key,
+            obj.use_shape_key_edit_mode,
+        ),
+        obj.mode,
+    )
+
+
+def can_count_without_evaluation(obj):
+    """Return True if the object's stats can be read from its original mesh data."""
+    # Edit Mode keeps its changes in BMesh until it is exited
+    if obj.mode == 'EDIT':
+        return False
+    return all(mod.type in TOPOLOGY_PRESERVING_MODIFIERS for mod in obj.modifiers if mod.show_viewport)
+
+
+def material_usage(materials, material_indices, weights=None):
+    """Return the triangles of every material used by faces and the materials of unused slots.
+
+    `material_indices` holds the material index of every face, `weights` its triangle count
+    (one triangle per face when omitted).
+    """
+    if not len(materials):
+        return {}, []
+
+    # Out of range material indices fall back to the last slot, as in Blender
+    slot_indices = np.minimum(material_indices, len(materials) - 1)
+    tris_per_slot = np.bincount(slot_indices, weights=weights, minlength=len(materials))
+
+    material_tris = {}
+    unused_slots = []
+    for mat, tris in zip(materials, tris_per_slot):
+        if mat is None:
+            continue
+        if tris:
+            material_tris[mat.name] = material_tris.get(mat.name, 0) + int(tris)
+        else:
+            unused_slots.append(mat.name)
+
+    # A material can sit in several slots of which only some are used
+    unused_slots = [name for name in unused_slots if name not in material_tris]
+
+    return material_tris, unused_slots
+
+
+def compute_object_stats(obj, depsgraph):
+    """Return the stats entry of a mesh object, evaluating its modifiers only when needed."""
+    # Deform-only stacks keep the topology of the original mesh, so the triangle count
+    # follows from the polygon sizes: every n-gon is split into n - 2 triangles.
+    if can_count_without_evaluation(obj):
+        mesh = obj.data
+        tri_count = len(mesh.loops) - 2 * len(mesh.polygons)
+        vertex_count = len(mesh.vertices)
+
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get('loop_total', loop_totals)
+        mesh.polygons.foreach_get('material_index', material_indices)
+
+        material_tris, unused_slots = material_usage(mesh.materials, material_indices, loop_totals - 2)
+    else:
+        # Get the evaluated mesh to account for modifiers
+        eval_obj = obj.evaluated_get(depsgraph)
+        mesh = eval_obj.to_mesh()
+
+        # Ensure loop triangles are calculated
+        mesh.calc_loop_triangles()
+        tri_count = len(mesh.loop_triangles)
+        vertex_count = len(mesh.vertices)
+
+        # Collect the materials actually used by faces
+        material_indices = np.empty(tri_count, dtype=np.int32)
+        mesh.loop_triangles.foreach_get('material_index', material_indices)
+        material_tris, unused_slots = material_usage(mesh.materials, material_indices)
+
+        # Clean up the mesh to free memory
+        eval_obj.to_mesh_clear()
+
+    return {
+        "tri_count": tri_count,
+        "vertex_count": vertex_count,
+        # Only materials used by faces cost a draw call
+        "materials": set(material_tris),
+        "material_tris": material_tris,
+        "unused_slots": unused_slots,
+        # Check if object has an armature modifier
+        "skinned": any(mod.type == 'ARMATURE' for mod in obj.modifiers),
+    }
+
+
+def get_object_stats(obj, depsgraph=None):
+    """Return the cached stats entry of a mesh object, evaluating it only on a cache miss."""
+    return get_objects_stats([obj], depsgraph)[0]
+
+
+def get_objects_stats(objects, depsgraph=None):
+    """Return the cached stats entries of mesh objects, evaluating only the cache misses.
+
+    The evaluated dependency graph is fetched once, on the first miss that needs it.
+    """
+    entries = []
+    for obj in objects:
+        key = object_stats_key(obj)
+        entry = stats_cache.get(key)
+        if entry is None:
+            if depsgraph is None and not can_count_without_evaluation(obj):
+                depsgraph = bpy.context.evaluated_depsgraph_get()
+            entry = compute_object_stats(obj, depsgraph)
+            stats_cache.put(key, entry)
+        entries.append(entry)
+    return entries
+
+
+def get_stats_cache_info():
+    """Return the hit/miss counters and size of the per-object stats cache."""
+    return stats_cache.info()
+
+
+def clear_stats_cache():
+    stats_cache.clear()
+
+
+# ----------------- Armature Dependents -----------------
+
+def get_armature_owners(obj):
+    """Return the session_uids of the armatures an object follows, through its parents or Armature modifiers."""
+    owners = set()
+
+    parent = obj.parent
+    while parent:
+        if parent.type == 'ARMATURE':
+            owners.add(parent.session_uid)
+        parent = parent.parent
+
+    for mod in obj.modifiers:
+        if mod.type == 'ARMATURE' and mod.object:
+            owners.add(mod.object.session_uid)
+
+    return frozenset(owners)
+
+
+class ArmatureDependentsIndex:
+    """Maps every armature of a scene to the objects depending on it.
+
+    Built with one scan of the scene and kept until the depsgraph handler sees an
+    object whose parents or Armature modifiers changed, so a lookup only costs as
+    much as the avatar it returns.
+    """
+
+    def __init__(self):
+        self.valid = False
+        self._scene_uid = None
+        self._object_count = 0
+        self._owners = {}
+        self._dependents = {}
+
+    def invalidate(self):
+        self.valid = False
+        self._owners.clear()
+        self._dependents.clear()
+
+    def build(self, scene):
+        self.invalidate()
+
+        for obj in scene.objects:
+            owners = get_armature_owners(obj)
+            self._owners[obj.session_uid] = owners
+            for armature_uid in owners:
+                self._dependents.setdefault(armature_uid, []).append(obj)
+
+        self._scene_uid = scene.session_uid
+        self._object_count = len(scene.objects)
+        self.valid = True
+
+    def get_dependents(self, scene, armature):
+        """Return the objects parented (also indirectly) or bound by modifier to the armature."""
+        # Added or removed objects don't always reach the depsgraph handler before a redraw
+        if not self.valid or self._scene_uid != scene.session_uid or self._object_count != len(scene.objects):
+            self.build(scene)
+
+        return list(self._dependents.get(armature.session_uid, ()))
+
+    def check_object(self, obj):
+        """Invalidate the index if an updated object changed the armatures it depends on."""
+        if self.valid and self._owners.get(obj.session_uid) != get_armature_owners(obj):
+            self.invalidate()
+
+
+armature_index = ArmatureDependentsIndex()
+
+
+@persistent
+def stats_depsgraph_update(scene, depsgraph):
+    """Drop the cached stats of objects whose mesh data changed in a way the cache key can't see."""
+    changed_objects = set()
+    changed_meshes = set()
+
+    for update in depsgraph.updates:
+        id_data = update.id.original
+
+        if isinstance(id_data, bpy.types.Object):
+            armature_index.check_object(id_data)
+
+        if isinstance(id_data, bpy.types.Mesh):
+            # Edited mesh data affects every object using it, selection changes don't
+            if update.is_updated_geometry:
+                changed_meshes.add(id_data.session_uid)
+        elif isinstance(id_data, bpy.types.Object) and id_data.type == 'MESH' and update.is_updated_geometry:
+            # Posing only re-evaluates deform modifiers, which keep the cached entry valid.
+            # Other modifiers can depend on data outside the fingerprint (Boolean cutters, node inputs).
+            if any(mod.type not in TOPOLOGY_PRESERVING_MODIFIERS for mod in id_data.modifiers):
+                changed_objects.add(id_data.session_uid)
+
+    # Weight painting and Clean Vertex update the mesh as well. VertexGroup.add() and remove()
+    # tag the object instead, so the weight writers of this module invalidate the cache themselves.
+    vertex_weight_cache.invalidate(changed_meshes)
+
+    if changed_objects or changed_meshes:
+        stats_cache.invalidate(changed_objects, changed_meshes)
+
+        # Restart background work from the next redraw with the new set of objects
+        cancel_stats_job()
+
+
+@persistent
+def stats_load_post(*args):
+    cancel_stats_job()
+    clear_stats_cache()
+    armature_index.invalidate()
+    vertex_weight_cache.clear()
+
+
+@persistent
+def stats_undo_post(*args):
+    # Undo replaces the objects the index holds on to and can restore older weights
+    armature_index.invalidate()
+    vertex_weight_cache.clear()
+
+
+def register_handlers():
+    if stats_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(stats_depsgraph_update)
+    if stats_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(stats_load_post)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if stats_undo_post not in handlers:
+            handlers.append(stats_undo_post)
+
+
+def unregister_handlers():
+    if stats_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(stats_depsgraph_update)
+    if stats_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(stats_load_post)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if stats_undo_post in handlers:
+            handlers.remove(stats_undo_post)
+    if bpy.app.timers.is_registered(_stats_job_tick):
+        bpy.app.timers.unregister(_stats_job_tick)
+    cancel_stats_job()
+    clear_stats_cache()
+    armature_index.invalidate()
+
+
+def get_bone_count(armature):
+    # Check if the armature is in Edit Mode
+    if armature.mode == 'EDIT':
+        return len(armature.data.edit_bones)
+    return len(armature.data.bones)
+
+
+def get_rating_scope(armature_name, rating_mode):
+    """Return the objects to rate and their bone count, or None if the rating mode can't be rated."""
     bone_count = 0
-    skinned_meshes = 0
 
     if rating_mode == 'ARMATURE' and armature_name:
         armature = bpy.data.objects.get(armature_name)
         
-        if armature.type != 'ARMATURE':
+        if armature is None or armature.type != 'ARMATURE':
             #print(f"No armature found with name '{armature_name}'")
             return None
 
-        # Check if the armature is in Edit Mode
-        if armature.mode == 'EDIT':
-            bone_count = len(armature.data.edit_bones)
-        else:
-            bone_count = len(armature.data.bones)
+        bone_count = get_bone_count(armature)
 
-        # Collect all objects parented to the armature
-        objects = [obj for obj in bpy.context.scene.objects if obj.parent == armature]
+        # Collect all objects parented (also indirectly) or bound by modifier to the armature
+        objects = armature_index.get_dependents(bpy.context.scene, armature)
     elif rating_mode == 'SCENE':
         # All visible objects in the scene
         objects = [obj for obj in bpy.context.visible_objects]
@@ -71,40 +468,25 @@ def get_performance_stats(armature_name, rating_mode):
 
         # Sum up the bone counts of all armatures
         for armature in armatures:
-            # Check if the armature is in Edit Mode
-            if armature.mode == 'EDIT':
-                bone_count += len(armature.data.edit_bones)
-            else:
-                bone_count += len(armature.data.bones)
+            bone_count += get_bone_count(armature)
     else:
         #print(f"Invalid rating_mode: '{rating_mode}'")
         return None
 
-    # Get the evaluated dependency graph for accurate data
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-
-    for obj in objects:
-        if obj.type == 'MESH':
-            # Get the evaluated mesh to account for modifiers
-            eval_obj = obj.evaluated_get(depsgraph)
-            mesh = eval_obj.to_mesh()
-
-            # Ensure loop triangles are calculated
-            mesh.calc_loop_triangles()
-            tri_count += len(mesh.loop_triangles)
+    return objects, bone_count
 
-            # Collect materials
-            for mat in mesh.materials:
-                if mat:
-                    material_set.add(mat.name)
 
-            # Check if object has an armature modifier
-            has_armature_modifier = any(mod.type == 'ARMATURE' for mod in obj.modifiers)
-            if has_armature_modifier:
-                skinned_meshes += 1
+def sum_object_stats(entries, bone_count):
+    """Add up per-object stats entries into the totals used for the rating."""
+    tri_count = 0
+    material_set = set()
+    skinned_meshes = 0
 
-            # Clean up the mesh to free memory
-            eval_obj.to_mesh_clear()
+    for entry in entries:
+        tri_count += entry["tri_count"]
+        material_set.update(entry["materials"])
+        if entry["skinned"]:
+            skinned_meshes += 1
 
     return {
         "tri_count": tri_count,
@@ -113,14 +495,216 @@ def get_performance_stats(armature_name, rating_mode):
         "skinned_meshes": skinned_meshes
     }
 
+
+def add_stats_breakdown(stats, objects, entries):
+    """Add per-object rows and triangles per material to the stats totals."""
+    stats["objects"] = [
+        {
+            "name": obj.name,
+            "tri_count": entry["tri_count"],
+            "vertex_count": entry["vertex_count"],
+            "material_count": len(entry["materials"]),
+            "skinned": entry["skinned"],
+        }
+        for obj, entry in zip(objects, entries)
+    ]
+
+    material_tris = {}
+    for entry in entries:
+        for name, tris in entry["material_tris"].items():
+            material_tris[name] = material_tris.get(name, 0) + tris
+    stats["material_tris"] = material_tris
+
+    return stats
+
+
+def add_unused_slots(stats, objects, entries):
+    """Add the materials sitting in slots no face uses, per object."""
+    stats["unused_slots"] = {obj.name: entry["unused_slots"] for obj, entry in zip(objects, entries) if entry["unused_slots"]}
+    return stats
+
+
+def get_performance_stats(armature_name, rating_mode, breakdown=False, unused_slots=False):
+    scope = get_rating_scope(armature_name, rating_mode)
+    if scope is None:
+        return None
+
+    objects, bone_count = scope
+    meshes = [obj for obj in objects if obj.type == 'MESH']
+
+    entries = get_objects_stats(meshes)
+
+    stats = sum_object_stats(entries, bone_count)
+    if breakdown:
+        add_stats_breakdown(stats, meshes, entries)
+    if unused_slots:
+        add_unused_slots(stats, meshes, entries)
+    return stats
+
+
+def get_all_armature_stats():
+    """Rate every armature of the scene on every device mode in a single shared pass.
+
+    Returns a list of (armature name, stats) pairs, where stats also holds a "ratings"
+    dict with the rating per device mode.
+    """
+    scene = bpy.context.scene
+
+    armatures = [obj for obj in scene.objects if obj.type == 'ARMATURE']
+    meshes_per_armature = [
+        [obj for obj in armature_index.get_dependents(scene, armature) if obj.type == 'MESH']
+        for armature in armatures
+    ]
+
+    # One pass over every armature so the evaluated depsgraph is fetched at most once,
+    # objects shared between armatures are cached after their first evaluation
+    all_entries = iter(get_objects_stats([obj for meshes in meshes_per_armature for obj in meshes]))
+
+    results = []
+    for armature, meshes in zip(armatures, meshes_per_armature):
+        entries = [next(all_entries) for _obj in meshes]
+
+        stats = sum_object_stats(entries, get_bone_count(armature))
+        stats["ratings"] = {device_mode: get_rating(stats, device_mode) for device_mode in RATING_THRESHOLDS}
+        results.append((armature.name, stats))
+
+    return results
+
+
+# ----------------- Background Stats -----------------
+
+class StatsJob:
+    """Fills the stats cache for a list of objects in time-budgeted slices."""
+
+    def __init__(self, object_names, budget):
+        self.object_names = object_names
+        self.budget = budget
+        self.index = 0
+
+    @property
+    def finished(self):
+        return self.index >= len(self.object_names)
+
+    def covers(self, object_names):
+        """Return True if all given objects are still waiting in this job."""
+        return set(object_names) <= set(self.object_names[self.index:])
+
+    def step(self):
+        """Process objects until the time budget of this tick is spent.
+
+        A single object is never split, so one very heavy mesh can exceed the budget.
+        """
+        start = time.perf_counter()
+        depsgraph = None
+
+        while not self.finished:
+            obj = bpy.data.objects.get(self.object_names[self.index])
+            self.index += 1
+
+            # The object may have been removed since the job started
+            if obj is None or obj.type != 'MESH':
+                continue
+
+            if depsgraph is None and not can_count_without_evaluation(obj):
+                depsgraph = bpy.context.evaluated_depsgraph_get()
+            get_object_stats(obj, depsgraph)
+
+            if time.perf_counter() - start >= self.budget:
+                break
+
+
+# Currently running background job, if any
+_stats_job = None
+
+
+def tag_redraw_view3d():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def _stats_job_tick():
+    global _stats_job
+
+    job = _stats_job
+    if job is None:
+        # The job was cancelled
+        return None
+
+    job.step()
+    tag_redraw_view3d()
+
+    if job.finished:
+        _stats_job = None
+        return None
+
+    # Give the UI a moment between slices
+    return 0.01
+
+
+def start_stats_job(object_names, budget):
+    """Start computing the given objects in the background, unless a running job already does."""
+    global _stats_job
+
+    if _stats_job is not None and _stats_job.covers(object_names):
+        _stats_job.budget = budget
+        return
+
+    _stats_job = StatsJob(object_names, budget)
+    if not bpy.app.timers.is_registered(_stats_job_tick):
+        bpy.app.timers.register(_stats_job_tick)
+
+
+def cancel_stats_job():
+    global _stats_job
+    _stats_job = None
+
+
+def get_performance_stats_progressive(armature_name, rating_mode, budget=0.02, breakdown=False, unused_slots=False):
+    """Return the stats of the cached objects and the fraction of objects that are cached.
+
+    Objects missing from the cache are handed to a background job which evaluates them
+    in slices of at most `budget` seconds, so the caller never blocks on evaluation.
+    """
+    scope = get_rating_scope(armature_name, rating_mode)
+    if scope is None:
+        return None, 1.0
+
+    objects, bone_count = scope
+    meshes = [obj for obj in objects if obj.type == 'MESH']
+
+    cached = []
+    entries = []
+    pending = []
+    for obj in meshes:
+        key = object_stats_key(obj)
+        if key in stats_cache:
+            cached.append(obj)
+            entries.append(stats_cache.get(key))
+        else:
+            pending.append(obj.name)
+
+    if pending:
+        start_stats_job(pending, budget)
+
+    stats = sum_object_stats(entries, bone_count)
+    if breakdown:
+        add_stats_breakdown(stats, cached, entries)
+    if unused_slots:
+        add_unused_slots(stats, cached, entries)
+
+    progress = len(entries) / len(meshes) if meshes else 1.0
+    return stats, progress
+
 # Function to get rating based on stats
 def get_rating(stats, device_mode):
     device = device_mode
     thresholds = RATING_THRESHOLDS[device]
 
-    if all(stats[key] <= thresholds["Good"][key] for key in stats):
+    if all(stats[key] <= thresholds["Good"][key] for key in thresholds["Good"]):
         return "Good"
-    elif all(stats[key] <= thresholds["Medium"][key] for key in stats):
+    elif all(stats[key] <= thresholds["Medium"][key] for key in thresholds["Medium"]):
         return "Medium"
     else:
         return "Poor"
@@ -137,6 +721,75 @@ def get_icon(value, limits):
         return 'STRIP_COLOR_01'
 
 
+# ----------------- Triangle Budget -----------------
+
+# Name of the Decimate modifier managed by the triangle budget
+DECIMATE_MODIFIER_NAME = "DOGS Decimate"
+
+
+def allocate_triangle_budget(counts, weights, budget, min_counts):
+    """Split a triangle budget across objects proportional to their weights.
+
+    No object gets more than its current count or less than its minimum; what gets cut off
+    at either end is shared out again among the rest. Returns the target count per object.
+    """
+    counts = counts.astype(np.float64)
+    min_counts = np.minimum(min_counts.astype(np.float64), counts)
+    weights = weights.astype(np.float64)
+
+    if budget >= counts.sum():
+        return counts
+    if budget <= min_counts.sum():
+        return min_counts
+
+    targets = min_counts.copy()
+    fixed = np.zeros(len(counts), dtype=bool)
+    while not fixed.all():
+        free = ~fixed
+        remaining = budget - targets[fixed].sum()
+        weight_sum = weights[free].sum()
+        if weight_sum <= 0:
+            break
+
+        proposal = targets.copy()
+        proposal[free] = remaining * weights[free] / weight_sum
+
+        # Clamp the objects over their count first, that leaves more for the others
+        over = free & (proposal > counts)
+        under = free & (proposal < min_counts)
+        if over.any():
+            targets[over] = counts[over]
+            fixed |= over
+        elif under.any():
+            targets[under] = min_counts[under]
+            fixed |= under
+        else:
+            targets = proposal
+            break
+
+    return targets
+
+
+def set_decimate_ratio(obj, ratio):
+    """Add or update the managed Decimate modifier of an object, a ratio of 1 removes it."""
+    mod = obj.modifiers.get(DECIMATE_MODIFIER_NAME)
+
+    if ratio >= 1.0:
+        if mod:
+            obj.modifiers.remove(mod)
+        return
+
+    if mod is None:
+        mod = obj.modifiers.new(DECIMATE_MODIFIER_NAME, 'DECIMATE')
+        mod.decimate_type = 'COLLAPSE'
+        # Decimate before skinning, the collapsed vertices keep interpolated weights
+        armature_position = next((i for i, modifier in enumerate(obj.modifiers) if modifier.type == 'ARMATURE'), None)
+        if armature_position is not None:
+            obj.modifiers.move(len(obj.modifiers) - 1, armature_position)
+
+    mod.ratio = ratio
+
+
 
 # Function to update the brush setting to weightpaint through mesh
 def update_brush_settings(context):
@@ -158,6 +811,1507 @@ def update_brush_settings(context):
 
 
 
+# ----------------- Mesh Arrays -----------------
+
+# foreach_get/foreach_set property, width and dtype per attribute data type
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ('value', 1, np.float32),
+    'INT': ('value', 1, np.int32),
+    'INT8': ('value', 1, np.int32),
+    'BOOLEAN': ('value', 1, bool),
+    'FLOAT2': ('vector', 2, np.float32),
+    'FLOAT_VECTOR': ('vector', 3, np.float32),
+    'INT32_2D': ('value', 2, np.int32),
+    'FLOAT_COLOR': ('color', 4, np.float32),
+    'BYTE_COLOR': ('color', 4, np.float32),
+    'QUATERNION': ('value', 4, np.float32),
+}
+
+MESH_DOMAINS = {'POINT', 'EDGE', 'FACE', 'CORNER'}
+
+# Attributes that are written through their own API instead of the generic attribute one
+_EXPLICIT_ATTRIBUTES = {'position', 'custom_normal'}
+
+
+def read_array(collection, prop, width=1, dtype=np.float32):
+    """Read a property of every item of a collection into an array of shape (len, width)."""
+    array = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(prop, array)
+    return array.reshape(-1, width) if width > 1 else array
+
+
+def write_array(collection, prop, array, dtype):
+    collection.foreach_set(prop, np.ascontiguousarray(array, dtype=dtype).ravel())
+
+
+def gather_ranges(starts, sizes):
+    """Return the concatenated index ranges start..start + size."""
+    offsets = np.repeat(starts - (np.cumsum(sizes) - sizes), sizes)
+    return offsets + np.arange(int(sizes.sum()))
+
+
+def read_vertex_weights(mesh):
+    """Return the vertex group weights of a mesh as CSR arrays (indptr, group indices, weights)."""
+    counts = []
+    groups = []
+    weights = []
+
+    # Deform weights aren't exposed as attributes, so this is the one per-vertex loop
+    for vertex in mesh.vertices:
+        elements = vertex.groups
+        counts.append(len(elements))
+        for element in elements:
+            groups.append(element.group)
+            weights.append(element.weight)
+
+    indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, np.array(groups, dtype=np.int32), np.array(weights, dtype=np.float32)
+
+
+def gather_vertex_weights(vertex_weights, vertex_ids):
+    """Return (local vertex index, group index, weight) of the weights of the given vertices."""
+    indptr, groups, weights = vertex_weights
+    starts = indptr[vertex_ids]
+    sizes = indptr[vertex_ids + 1] - starts
+    index = gather_ranges(starts, sizes)
+    return np.repeat(np.arange(len(vertex_ids)), sizes), groups[index], weights[index]
+
+
+class VertexWeightCache:
+    """Vertex group weights of meshes as CSR arrays (see read_vertex_weights), kept until the mesh changes."""
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, mesh):
+        entry = self._entries.get(mesh.session_uid)
+        # A changed vertex count means an update was missed
+        if entry is None or len(entry[0]) - 1 != len(mesh.vertices):
+            entry = read_vertex_weights(mesh)
+            self._entries[mesh.session_uid] = entry
+        return entry
+
+    def invalidate(self, mesh_uids):
+        for uid in mesh_uids:
+            self._entries.pop(uid, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+vertex_weight_cache = VertexWeightCache()
+
+
+def influencing_groups(mesh, vertex_mask):
+    """Return the indices of the vertex groups giving weight to any of the masked vertices."""
+    vertex_ids = np.flatnonzero(vertex_mask)
+    _vertices, groups, weights = gather_vertex_weights(vertex_weight_cache.get(mesh), vertex_ids)
+    return np.unique(groups[weights > 0])
+
+
+def write_vertex_weights(obj, vertices, groups, weights):
+    """Assign weights to vertex groups with one add() call per group and distinct weight."""
+    if not len(groups):
+        return
+
+    order = np.lexsort((weights, groups))
+    vertices, groups, weights = vertices[order], groups[order], weights[order]
+
+    run_starts = np.flatnonzero(np.r_[True, (groups[1:] != groups[:-1]) | (weights[1:] != weights[:-1])])
+    run_ends = np.r_[run_starts[1:], len(groups)]
+
+    for start, end in zip(run_starts, run_ends):
+        obj.vertex_groups[int(groups[start])].add(vertices[start:end].tolist(), float(weights[start]), 'REPLACE')
+
+    vertex_weight_cache.invalidate([obj.data.session_uid])
+
+
+def read_shape_keys(mesh):
+    if mesh.shape_keys is None:
+        return []
+
+    return [
+        {
+            "name": key_block.name,
+            "co": read_array(key_block.data, 'co', 3),
+            "relative_key": key_block.relative_key.name,
+            "value": key_block.value,
+            "slider_min": key_block.slider_min,
+            "slider_max": key_block.slider_max,
+            "mute": key_block.mute,
+            "interpolation": key_block.interpolation,
+            "vertex_group": key_block.vertex_group,
+        }
+        for key_block in mesh.shape_keys.key_blocks
+    ]
+
+
+def write_shape_keys(obj, shape_keys, vertex_ids):
+    """Recreate shape keys on an object, keeping the coordinates of the given source vertices."""
+    for shape_key in shape_keys:
+        key_block = obj.shape_key_add(name=shape_key["name"], from_mix=False)
+        write_array(key_block.data, 'co', shape_key["co"][vertex_ids], np.float32)
+        key_block.slider_min = shape_key["slider_min"]
+        key_block.slider_max = shape_key["slider_max"]
+        key_block.value = shape_key["value"]
+        key_block.mute = shape_key["mute"]
+        key_block.interpolation = shape_key["interpolation"]
+        key_block.vertex_group = shape_key["vertex_group"]
+
+    if shape_keys:
+        key_blocks = obj.data.shape_keys.key_blocks
+        for shape_key in shape_keys:
+            key_blocks[shape_key["name"]].relative_key = key_blocks[shape_key["relative_key"]]
+
+
+def read_mesh_data(mesh):
+    """Read everything needed to rebuild parts of a mesh into arrays, in one pass."""
+    attributes = {}
+    for attr in mesh.attributes:
+        layout = ATTRIBUTE_LAYOUTS.get(attr.data_type)
+        # Names starting with a dot are internal (selection, UV pins, topology)
+        if layout is None or attr.domain not in MESH_DOMAINS or attr.name.startswith('.') or attr.name in _EXPLICIT_ATTRIBUTES:
+            continue
+        prop, width, dtype = layout
+        attributes[attr.name] = (attr.data_type, attr.domain, read_array(attr.data, prop, width, dtype))
+
+    return {
+        "positions": read_array(mesh.vertices, 'co', 3),
+        "edges": read_array(mesh.edges, 'vertices', 2, np.int32),
+        "seams": read_array(mesh.edges, 'use_seam', 1, bool),
+        "loop_vertices": read_array(mesh.loops, 'vertex_index', 1, np.int32),
+        "loop_edges": read_array(mesh.loops, 'edge_index', 1, np.int32),
+        "loop_starts": read_array(mesh.polygons, 'loop_start', 1, np.int32),
+        "loop_totals": read_array(mesh.polygons, 'loop_total', 1, np.int32),
+        "attributes": attributes,
+        "normals": read_array(mesh.corner_normals, 'vector', 3) if mesh.has_custom_normals else None,
+        "vertex_weights": read_vertex_weights(mesh),
+        "shape_keys": read_shape_keys(mesh),
+        "materials": list(mesh.materials),
+        "active_uv": mesh.uv_layers.active.name if mesh.uv_layers.active else None,
+        "render_uv": next((layer.name for layer in mesh.uv_layers if layer.active_render), None),
+        "active_color": mesh.color_attributes.active_color_name,
+        "default_color": mesh.color_attributes.default_color_name,
+    }
+
+
+def write_mesh_geometry(mesh, positions, edges, loop_vertices, loop_edges, loop_starts):
+    mesh.vertices.add(len(positions))
+    mesh.edges.add(len(edges))
+    mesh.loops.add(len(loop_vertices))
+    mesh.polygons.add(len(loop_starts))
+
+    write_array(mesh.vertices, 'co', positions, np.float32)
+    write_array(mesh.edges, 'vertices', edges, np.int32)
+    write_array(mesh.loops, 'vertex_index', loop_vertices, np.int32)
+    write_array(mesh.loops, 'edge_index', loop_edges, np.int32)
+    # Polygon sizes follow from the start offsets
+    write_array(mesh.polygons, 'loop_start', loop_starts, np.int32)
+
+
+def write_mesh_attributes(mesh, attributes):
+    for name, (data_type, domain, array) in attributes.items():
+        prop, _width, dtype = ATTRIBUTE_LAYOUTS[data_type]
+        attr = mesh.attributes.get(name) or mesh.attributes.new(name, data_type, domain)
+        write_array(attr.data, prop, array, dtype)
+
+
+def write_mesh_defaults(mesh, data):
+    """Restore active UV map and color attribute and the material slots."""
+    for mat in data["materials"]:
+        mesh.materials.append(mat)
+
+    if data["active_uv"] and data["active_uv"] in mesh.uv_layers:
+        mesh.uv_layers.active = mesh.uv_layers[data["active_uv"]]
+    if data["render_uv"] and data["render_uv"] in mesh.uv_layers:
+        mesh.uv_layers[data["render_uv"]].active_render = True
+    if data["active_color"] and data["active_color"] in mesh.color_attributes:
+        mesh.color_attributes.active_color_name = data["active_color"]
+    if data["default_color"] and data["default_color"] in mesh.color_attributes:
+        mesh.color_attributes.default_color_name = data["default_color"]
+
+
+def extract_submesh(data, name, poly_ids, loose_edge_ids, loose_vertex_ids):
+    """Build a new mesh from the given polygons, loose edges and loose vertices of read mesh data.
+
+    Returns the mesh and the source indices of its vertices.
+    """
+    sizes = data["loop_totals"][poly_ids]
+    loop_ids = gather_ranges(data["loop_starts"][poly_ids], sizes)
+    loop_edges = data["loop_edges"][loop_ids]
+
+    # Every corner's vertex lies on the corner's edge, so the edges give all vertices
+    edge_ids = np.unique(np.concatenate((loop_edges, loose_edge_ids)))
+    vertex_ids = np.unique(np.concatenate((data["edges"][edge_ids].ravel(), loose_vertex_ids)))
+
+    mesh = bpy.data.meshes.new(name)
+    write_mesh_geometry(
+        mesh,
+        data["positions"][vertex_ids],
+        np.searchsorted(vertex_ids, data["edges"][edge_ids]),
+        np.searchsorted(vertex_ids, data["loop_vertices"][loop_ids]),
+        np.searchsorted(edge_ids, loop_edges),
+        np.cumsum(sizes) - sizes,
+    )
+
+    domain_ids = {'POINT': vertex_ids, 'EDGE': edge_ids, 'FACE': poly_ids, 'CORNER': loop_ids}
+    write_mesh_attributes(mesh, {
+        attr_name: (data_type, domain, array[domain_ids[domain]])
+        for attr_name, (data_type, domain, array) in data["attributes"].items()
+    })
+    write_array(mesh.edges, 'use_seam', data["seams"][edge_ids], bool)
+    write_mesh_defaults(mesh, data)
+
+    mesh.update()
+
+    if data["normals"] is not None:
+        mesh.normals_split_custom_set(data["normals"][loop_ids])
+
+    return mesh, vertex_ids
+
+
+def assign_submesh(obj, mesh, data, vertex_ids):
+    """Give an object a mesh built by extract_submesh, with its vertex weights and shape keys."""
+    obj.data = mesh
+    write_vertex_weights(obj, *gather_vertex_weights(data["vertex_weights"], vertex_ids))
+    write_shape_keys(obj, data["shape_keys"], vertex_ids)
+
+
+def copy_object(obj):
+    """Duplicate an object (modifiers, vertex groups, parent) into the same collections, sharing its data."""
+    new_obj = obj.copy()
+    for collection in obj.users_collection:
+        collection.objects.link(new_obj)
+    return new_obj
+
+
+def group_by_part(parts, part_count):
+    """Return the element order sorted by part and the offsets of every part in it."""
+    order = np.argsort(parts, kind='stable')
+    offsets = np.zeros(part_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(parts, minlength=part_count), out=offsets[1:])
+    return order, offsets
+
+
+def split_mesh_object(obj, data, part_count, poly_parts, loose_edges, loose_edge_parts, loose_vertices, loose_vertex_parts):
+    """Split a mesh object into one object per part. The first part stays in the original object.
+
+    Returns the objects of all non-empty parts.
+    """
+    poly_order, poly_offsets = group_by_part(poly_parts, part_count)
+    edge_order, edge_offsets = group_by_part(loose_edge_parts, part_count)
+    vertex_order, vertex_offsets = group_by_part(loose_vertex_parts, part_count)
+    loose_edges = loose_edges[edge_order]
+    loose_vertices = loose_vertices[vertex_order]
+
+    source_mesh = obj.data
+    objects = []
+
+    for part in range(part_count):
+        poly_ids = poly_order[poly_offsets[part]:poly_offsets[part + 1]]
+        edge_ids = loose_edges[edge_offsets[part]:edge_offsets[part + 1]]
+        vertex_ids = loose_vertices[vertex_offsets[part]:vertex_offsets[part + 1]]
+        if not (len(poly_ids) or len(edge_ids) or len(vertex_ids)):
+            continue
+
+        mesh, source_vertices = extract_submesh(data, source_mesh.name, poly_ids, edge_ids, vertex_ids)
+        target = copy_object(obj) if objects else obj
+        assign_submesh(target, mesh, data, source_vertices)
+        objects.append(target)
+
+    if source_mesh.users == 0:
+        bpy.data.meshes.remove(source_mesh)
+
+    return objects
+
+
+def loose_geometry(data):
+    """Return the indices of edges without faces and of vertices without edges."""
+    used_edges = np.zeros(len(data["edges"]), dtype=bool)
+    used_edges[data["loop_edges"]] = True
+    used_vertices = np.zeros(len(data["positions"]), dtype=bool)
+    used_vertices[data["edges"].ravel()] = True
+    return np.flatnonzero(~used_edges), np.flatnonzero(~used_vertices)
+
+
+# ----------------- Loose Parts -----------------
+
+def mesh_islands(vertex_count, edges):
+    """Label the connected parts of a mesh with a vectorized union-find over its edges.
+
+    Returns the island index of every vertex and the number of islands.
+    """
+    labels = np.arange(vertex_count)
+
+    if len(edges):
+        a = edges[:, 0]
+        b = edges[:, 1]
+        while True:
+            label_a = labels[a]
+            label_b = labels[b]
+            differ = label_a != label_b
+            if not differ.any():
+                break
+
+            # Hook the larger root onto the smaller one
+            np.minimum.at(labels, np.maximum(label_a[differ], label_b[differ]), np.minimum(label_a[differ], label_b[differ]))
+
+            # Compress the paths until every label points at its root
+            while True:
+                parents = labels[labels]
+                if np.array_equal(parents, labels):
+                    break
+                labels = parents
+
+    roots, islands = np.unique(labels, return_inverse=True)
+    return islands, len(roots)
+
+
+def separate_loose_parts(obj):
+    """Split a mesh object into one object per loose part, keeping custom normals, UVs,
+    attributes, vertex groups, shape keys and materials.
+
+    Returns the objects of all parts, the original object first.
+    """
+    data = read_mesh_data(obj.data)
+    islands, island_count = mesh_islands(len(data["positions"]), data["edges"])
+    if island_count < 2:
+        return [obj]
+
+    loose_edges, loose_vertices = loose_geometry(data)
+    poly_parts = islands[data["loop_vertices"][data["loop_starts"]]]
+
+    return split_mesh_object(
+        obj, data, island_count,
+        poly_parts,
+        loose_edges, islands[data["edges"][loose_edges, 0]],
+        loose_vertices, islands[loose_vertices],
+    )
+
+
+# ----------------- Material Parts -----------------
+
+def separate_by_materials(obj):
+    """Split a mesh object into one object per used material slot, keeping custom normals, UVs,
+    attributes, vertex groups, shape keys and modifiers. Loose edges and vertices stay with
+    the original object.
+
+    Returns the objects of all parts, the original object first.
+    """
+    data = read_mesh_data(obj.data)
+    slot_count = max(len(data["materials"]), 1)
+
+    material_index = data["attributes"].get("material_index")
+    if material_index is None:
+        return [obj]
+    # Faces pointing past the last slot render with the last one, like in the stats
+    poly_parts = np.clip(material_index[2], 0, slot_count - 1)
+    if len(np.unique(poly_parts)) < 2:
+        return [obj]
+
+    loose_edges, loose_vertices = loose_geometry(data)
+    first_part = int(poly_parts.min())
+
+    return split_mesh_object(
+        obj, data, slot_count,
+        poly_parts,
+        loose_edges, np.full(len(loose_edges), first_part, dtype=np.int64),
+        loose_vertices, np.full(len(loose_vertices), first_part, dtype=np.int64),
+    )
+
+
+# ----------------- Join -----------------
+
+def flip_loop_order(loop_starts, loop_totals):
+    """Return the corner and edge order that reverses the winding of every face.
+
+    The first corner of a face stays in place: corners v0, v1 .. vn-1 become v0, vn-1 .. v1.
+    """
+    offsets = np.repeat(loop_starts, loop_totals)
+    sizes = np.repeat(loop_totals, loop_totals)
+    corners = np.arange(len(offsets)) - offsets
+    return offsets + (sizes - corners) % sizes, offsets + (sizes - corners - 1) % sizes
+
+
+def transform_points(points, matrix):
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def transform_normals(normals, matrix):
+    normals = normals @ np.linalg.inv(matrix[:3, :3])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.maximum(lengths, 1e-12)
+
+
+def merge_materials(sources):
+    """Merge the material slots of all sources. Returns the merged slots and, per source,
+    an array mapping its slot indices to the merged ones."""
+    materials = []
+    slot_maps = []
+    for data in sources:
+        slot_map = []
+        for mat in data["materials"]:
+            if mat not in materials:
+                materials.append(mat)
+            slot_map.append(materials.index(mat))
+        slot_maps.append(np.array(slot_map or [0], dtype=np.int32))
+    return materials, slot_maps
+
+
+def merge_vertex_groups(target, objects):
+    """Add the vertex groups of all objects to the target by name. Returns, per object,
+    an array mapping its group indices to the target ones."""
+    group_maps = []
+    for obj in objects:
+        group_map = []
+        for vertex_group in obj.vertex_groups:
+            target_group = target.vertex_groups.get(vertex_group.name) or target.vertex_groups.new(name=vertex_group.name)
+            group_map.append(target_group.index)
+        group_maps.append(np.array(group_map, dtype=np.int32))
+    return group_maps
+
+
+def merge_attribute_layouts(sources):
+    """Return {name: (data type, domain)} of all generic attributes, the first layout of a name wins."""
+    layouts = {}
+    for data in sources:
+        for name, (data_type, domain, _array) in data["attributes"].items():
+            if name != 'material_index':
+                layouts.setdefault(name, (data_type, domain))
+    return layouts
+
+
+def join_mesh_objects(target, objects):
+    """Join mesh objects into the target by concatenating their mesh arrays, like bpy.ops.object.join
+    without the operator overhead. The other objects are removed.
+
+    Returns the seconds spent in each stage.
+    """
+    timings = {}
+    objects = [target] + [obj for obj in objects if obj is not target]
+
+    # Gather: every mesh is read once, even when several objects share it
+    start = time.perf_counter()
+    mesh_data = {}
+    for obj in objects:
+        if obj.data not in mesh_data:
+            mesh_data[obj.data] = read_mesh_data(obj.data)
+    sources = [mesh_data[obj.data] for obj in objects]
+
+    # Custom normals of one part keep all parts from being auto smoothed, so every part needs them
+    use_normals = any(data["normals"] is not None for data in sources)
+    normals = [
+        data["normals"] if data["normals"] is not None or not use_normals else read_array(obj.data.corner_normals, 'vector', 3)
+        for obj, data in zip(objects, sources)
+    ]
+    timings["gather"] = time.perf_counter() - start
+
+    # Transform: everything into the local space of the target, faces of mirrored parts flipped
+    start = time.perf_counter()
+    to_target = np.array(target.matrix_world.inverted(), dtype=np.float64)
+    matrices = [to_target @ np.array(obj.matrix_world, dtype=np.float64) for obj in objects]
+
+    positions = []
+    corner_orders = []
+    edge_orders = []
+    for i, (data, matrix) in enumerate(zip(sources, matrices)):
+        positions.append(transform_points(data["positions"], matrix))
+        if use_normals:
+            normals[i] = transform_normals(normals[i], matrix)
+        if np.linalg.det(matrix[:3, :3]) < 0:
+            corner_order, edge_order = flip_loop_order(data["loop_starts"], data["loop_totals"])
+        else:
+            corner_order = edge_order = np.arange(len(data["loop_vertices"]))
+        corner_orders.append(corner_order)
+        edge_orders.append(edge_order)
+    timings["transform"] = time.perf_counter() - start
+
+    # Merge: offsets, material slots, vertex groups, attributes and shape keys
+    start = time.perf_counter()
+    vertex_offsets = np.cumsum([0] + [len(data["positions"]) for data in sources])
+    edge_offsets = np.cumsum([0] + [len(data["edges"]) for data in sources])
+    loop_offsets = np.cumsum([0] + [len(data["loop_vertices"]) for data in sources])
+
+    edges = np.concatenate([data["edges"] + offset for data, offset in zip(sources, vertex_offsets)])
+    loop_vertices = np.concatenate([
+        data["loop_vertices"][order] + offset for data, order, offset in zip(sources, corner_orders, vertex_offsets)
+    ])
+    loop_edges = np.concatenate([
+        data["loop_edges"][order] + offset for data, order, offset in zip(sources, edge_orders, edge_offsets)
+    ])
+    loop_starts = np.concatenate([data["loop_starts"] + offset for data, offset in zip(sources, loop_offsets)])
+    seams = np.concatenate([data["seams"] for data in sources])
+
+    materials, slot_maps = merge_materials(sources)
+    material_indices = []
+    for data, slot_map in zip(sources, slot_maps):
+        material_index = data["attributes"].get("material_index")
+        indices = material_index[2] if material_index else np.zeros(len(data["loop_starts"]), dtype=np.int32)
+        material_indices.append(slot_map[np.clip(indices, 0, len(slot_map) - 1)])
+
+    attributes = {}
+    for name, (data_type, domain) in merge_attribute_layouts(sources).items():
+        _prop, width, dtype = ATTRIBUTE_LAYOUTS[data_type]
+        arrays = []
+        for data, corner_order in zip(sources, corner_orders):
+            size = {
+                'POINT': len(data["positions"]), 'EDGE': len(data["edges"]),
+                'FACE': len(data["loop_starts"]), 'CORNER': len(data["loop_vertices"]),
+            }[domain]
+            source = data["attributes"].get(name)
+            if source is None or source[:2] != (data_type, domain):
+                arrays.append(np.zeros((size, width) if width > 1 else size, dtype=dtype))
+            else:
+                arrays.append(source[2][corner_order] if domain == 'CORNER' else source[2])
+        attributes[name] = (data_type, domain, np.concatenate(arrays))
+    attributes["material_index"] = ('INT', 'FACE', np.concatenate(material_indices))
+
+    group_maps = merge_vertex_groups(target, objects)
+    weight_vertices = []
+    weight_groups = []
+    weights = []
+    for data, group_map, offset in zip(sources, group_maps, vertex_offsets):
+        indptr, groups, group_weights = data["vertex_weights"]
+        # Skip weights of groups the object no longer has
+        valid = groups < len(group_map)
+        vertices = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        weight_vertices.append(vertices[valid] + offset)
+        weight_groups.append(group_map[groups[valid]])
+        weights.append(group_weights[valid])
+
+    shape_keys = {}
+    for data in sources:
+        for shape_key in data["shape_keys"]:
+            shape_keys.setdefault(shape_key["name"], dict(shape_key, co=[]))
+    for data, position, matrix in zip(sources, positions, matrices):
+        keys = {shape_key["name"]: shape_key for shape_key in data["shape_keys"]}
+        basis = data["shape_keys"][0]["co"] if data["shape_keys"] else None
+        for name, shape_key in shape_keys.items():
+            if name in keys:
+                shape_key["co"].append(transform_points(keys[name]["co"], matrix))
+            elif basis is not None:
+                shape_key["co"].append(transform_points(basis, matrix))
+            else:
+                shape_key["co"].append(position)
+    for shape_key in shape_keys.values():
+        shape_key["co"] = np.concatenate(shape_key["co"])
+    timings["merge"] = time.perf_counter() - start
+
+    # Write: one new mesh for the target, the other objects are removed
+    start = time.perf_counter()
+    mesh = bpy.data.meshes.new(target.data.name)
+    write_mesh_geometry(mesh, np.concatenate(positions), edges, loop_vertices, loop_edges, loop_starts)
+    write_mesh_attributes(mesh, attributes)
+    write_array(mesh.edges, 'use_seam', seams, bool)
+    write_mesh_defaults(mesh, dict(sources[0], materials=materials))
+    mesh.update()
+
+    if use_normals:
+        mesh.normals_split_custom_set(np.concatenate([
+            part_normals[order] for part_normals, order in zip(normals, corner_orders)
+        ]))
+
+    source_meshes = set(mesh_data)
+    target.data = mesh
+    write_vertex_weights(target, np.concatenate(weight_vertices), np.concatenate(weight_groups), np.concatenate(weights))
+    write_shape_keys(target, list(shape_keys.values()), np.arange(len(mesh.vertices)))
+
+    for obj in objects[1:]:
+        bpy.data.objects.remove(obj)
+    for source_mesh in source_meshes:
+        if source_mesh.users == 0:
+            bpy.data.meshes.remove(source_mesh)
+    timings["write"] = time.perf_counter() - start
+
+    return timings
+
+
+# ----------------- Distribute -----------------
+
+def bound_box_corners(objects):
+    """Return the local bounding box corners of the objects as an (N, 8, 3) array."""
+    return np.array([[corner[:] for corner in obj.bound_box] for obj in objects], dtype=np.float64).reshape(-1, 8, 3)
+
+
+def world_bounds(objects, corners=None):
+    """Return the world space bounding box minimum and maximum of every object as (N, 3) arrays."""
+    if corners is None:
+        corners = bound_box_corners(objects)
+    matrices = np.array([obj.matrix_world for obj in objects], dtype=np.float64).reshape(-1, 4, 4)
+    world = np.einsum('nij,nkj->nki', matrices[:, :3, :3], corners) + matrices[:, None, :3, 3]
+    return world.min(axis=1), world.max(axis=1)
+
+
+def find_mirror_pairs(centers, axis_index, mirror_axis_index, precision=4):
+    """Group objects with their mirrored counterpart: same position along the axis, opposite along
+    the mirror axis. Returns lists of object indices, single objects stay alone."""
+    axis_values = np.round(centers[:, axis_index], precision).tolist()
+    mirror_values = np.round(centers[:, mirror_axis_index], precision).tolist()
+
+    buckets = {}
+    for i, key in enumerate(zip(axis_values, mirror_values)):
+        buckets.setdefault(key, []).append(i)
+
+    groups = []
+    processed = set()
+    for i, (axis_value, mirror_value) in enumerate(zip(axis_values, mirror_values)):
+        if i in processed:
+            continue
+        processed.add(i)
+
+        candidates = buckets.get((axis_value, -mirror_value), [])
+        # Drop candidates already grouped, so every bucket is walked once overall
+        while candidates and candidates[0] in processed:
+            candidates.pop(0)
+
+        if candidates:
+            other = candidates.pop(0)
+            processed.add(other)
+            groups.append([i, other])
+        else:
+            groups.append([i])
+
+    return groups
+
+
+def shelf_pack(sizes, margin):
+    """Pack rectangles onto shelves of a roughly square area, tallest first.
+
+    Returns the minimum corner of every rectangle as an (N, 2) array.
+    """
+    padded = sizes + margin
+    shelf_width = max(padded[:, 0].max(), np.sqrt(padded.prod(axis=1).sum()))
+    order = np.lexsort((-padded[:, 0], -padded[:, 1]))
+
+    positions = np.zeros_like(padded)
+    x = y = shelf_height = 0.0
+    for i in order.tolist():
+        width, height = padded[i]
+        # Start a new shelf once the row is full
+        if x > 0.0 and x + width > shelf_width + 1e-9:
+            x = 0.0
+            y += shelf_height
+            shelf_height = 0.0
+        positions[i] = x, y
+        x += width
+        shelf_height = max(shelf_height, height)
+
+    return positions
+
+
+# Object custom property keeping the total offset of the distribute layouts, so they can be restored
+LAYOUT_OFFSET_PROPERTY = "dogs_layout_offset"
+
+
+def world_to_location_offset(obj, delta):
+    """Convert a world space offset to an offset of obj.location, which is in parent space."""
+    if obj.parent is None:
+        return Vector(delta)
+    # Parent matrix including the parent inverse and bone parenting
+    parent_matrix = obj.matrix_world @ obj.matrix_basis.inverted_safe()
+    return parent_matrix.to_3x3().inverted_safe() @ Vector(delta)
+
+
+def offset_object(obj, delta):
+    """Move an object by a world space offset and remember it for restore_layout_offset."""
+    obj.location += world_to_location_offset(obj, delta)
+    offset = obj.get(LAYOUT_OFFSET_PROPERTY, (0.0, 0.0, 0.0))
+    obj[LAYOUT_OFFSET_PROPERTY] = [a + b for a, b in zip(offset, delta)]
+
+
+def restore_layout_offset(obj):
+    """Move an object back by the offset remembered by offset_object. Returns False if there is none."""
+    offset = obj.get(LAYOUT_OFFSET_PROPERTY)
+    if offset is None:
+        return False
+    obj.location -= world_to_location_offset(obj, offset)
+    del obj[LAYOUT_OFFSET_PROPERTY]
+    return True
+
+
+def set_origins_to_bounds(objects, corners=None):
+    """Move the origin of every single-user mesh object to the center of its bounding box,
+    like origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS') without the per-object operator call.
+
+    Returns the number of objects whose origin was moved.
+    """
+    if corners is None:
+        corners = bound_box_corners(objects)
+    centers = (corners.min(axis=1) + corners.max(axis=1)) / 2
+
+    moved = 0
+    for obj, center in zip(objects, centers):
+        if obj.type != 'MESH' or obj.data.users > 1 or not center.any():
+            continue
+
+        offset = Matrix.Translation(center)
+        obj.data.transform(Matrix.Translation(-center), shape_keys=True)
+        obj.matrix_world = obj.matrix_world @ offset
+        # Keep the children where they are
+        for child in obj.children:
+            child.matrix_parent_inverse = offset.inverted() @ child.matrix_parent_inverse
+        moved += 1
+
+    return moved
+
+
+# ----------------- Face Sizes -----------------
+
+# Histogram bins of face_size_classes
+FACE_SIZE_CLASSES = ('TRIS', 'QUADS', 'NGONS')
+
+
+def face_size_classes(mesh):
+    """Return the class of every face of a mesh: 0 for triangles, 1 for quads, 2 for ngons."""
+    sizes = read_array(mesh.polygons, 'loop_total', 1, np.int32)
+    return np.clip(sizes - 3, 0, 2)
+
+
+def count_face_sizes(classes):
+    counts = np.bincount(classes, minlength=len(FACE_SIZE_CLASSES))
+    return dict(zip(FACE_SIZE_CLASSES, counts.tolist()))
+
+
+def read_topology(mesh):
+    return {
+        "edges": read_array(mesh.edges, 'vertices', 2, np.int32),
+        "loop_vertices": read_array(mesh.loops, 'vertex_index', 1, np.int32),
+        "loop_edges": read_array(mesh.loops, 'edge_index', 1, np.int32),
+        "loop_starts": read_array(mesh.polygons, 'loop_start', 1, np.int32),
+        "loop_totals": read_array(mesh.polygons, 'loop_total', 1, np.int32),
+    }
+
+
+def select_elements(mesh, topology, vertex_mask, edge_mask, face_mask):
+    """Select exactly the given vertices, edges and faces, plus the edges and vertices of the faces
+    and the vertices of the edges. Must run outside of Edit Mode."""
+    loop_ids = gather_ranges(topology["loop_starts"][face_mask], topology["loop_totals"][face_mask])
+
+    edge_mask = edge_mask.copy()
+    edge_mask[topology["loop_edges"][loop_ids]] = True
+    vertex_mask = vertex_mask.copy()
+    vertex_mask[topology["edges"][edge_mask].ravel()] = True
+
+    write_array(mesh.vertices, 'select', vertex_mask, bool)
+    write_array(mesh.edges, 'select', edge_mask, bool)
+    write_array(mesh.polygons, 'select', face_mask, bool)
+    mesh.update()
+
+
+def select_faces(mesh, face_mask):
+    """Select exactly the given faces with their edges and vertices. Must run outside of Edit Mode."""
+    select_elements(
+        mesh, read_topology(mesh),
+        np.zeros(len(mesh.vertices), dtype=bool), np.zeros(len(mesh.edges), dtype=bool), face_mask
+    )
+
+
+def find_faces_by_size(objects, size_class, select=True):
+    """Count the faces of one size class on every object and optionally select only those.
+
+    Returns {object name: {'TRIS': n, 'QUADS': n, 'NGONS': n}} for the given mesh objects.
+    """
+    class_index = FACE_SIZE_CLASSES.index(size_class)
+    histograms = {}
+    for obj in objects:
+        classes = face_size_classes(obj.data)
+        histograms[obj.name] = count_face_sizes(classes)
+        if select:
+            select_faces(obj.data, classes == class_index)
+    return histograms
+
+
+# ----------------- Mesh Health -----------------
+
+# Checks of scan_mesh_health with their report labels
+HEALTH_CHECKS = {
+    'DUPLICATE_VERTICES': "duplicate vertices",
+    'ZERO_AREA_FACES': "zero area faces",
+    'LOOSE_VERTICES': "loose vertices",
+    'LOOSE_EDGES': "loose edges",
+    'NON_MANIFOLD_EDGES': "non-manifold edges",
+    'DEGENERATE_UVS': "faces with degenerate UVs",
+}
+
+
+def polygon_vector_areas(points, loop_points, loop_starts, loop_totals):
+    """Return the vector area of every polygon, the sum of the cross products of its consecutive corners."""
+    offsets = np.repeat(loop_starts, loop_totals)
+    sizes = np.repeat(loop_totals, loop_totals)
+    next_loops = offsets + (np.arange(len(offsets)) - offsets + 1) % sizes
+
+    corners = points[loop_points]
+    following = corners[next_loops]
+    if points.shape[1] == 2:
+        crosses = corners[:, 0] * following[:, 1] - corners[:, 1] * following[:, 0]
+    else:
+        crosses = np.cross(corners, following)
+
+    if not len(loop_starts):
+        return crosses[:0]
+    return np.add.reduceat(crosses, loop_starts) / 2
+
+
+def close_point_pairs(points, distance):
+    """Return every pair (i, j) with i < j of points at most the distance apart.
+
+    Points are bucketed into a grid with the distance as cell size, then each point is
+    compared against the points of its own and its 26 neighbouring cells.
+    """
+    pairs = np.empty((0, 2), dtype=np.int64)
+    if len(points) < 2 or distance <= 0:
+        return pairs
+
+    cells = np.floor(points / distance).astype(np.int64)
+
+    # Rank the cell coordinates per axis so a cell id fits in one integer
+    axis_values = [np.unique(cells[:, axis]) for axis in range(3)]
+
+    def cell_ids(offset):
+        ids = np.zeros(len(cells), dtype=np.int64)
+        valid = np.ones(len(cells), dtype=bool)
+        for axis, values in enumerate(axis_values):
+            shifted = cells[:, axis] + offset[axis]
+            ranks = np.minimum(np.searchsorted(values, shifted), len(values) - 1)
+            valid &= values[ranks] == shifted
+            ids = ids * len(values) + ranks
+        return ids, valid
+
+    own_ids, _valid = cell_ids((0, 0, 0))
+    order = np.argsort(own_ids, kind='stable')
+    sorted_ids = own_ids[order]
+
+    found = [pairs]
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                ids, valid = cell_ids((dx, dy, dz))
+                starts = np.searchsorted(sorted_ids, ids, side='left')
+                sizes = np.where(valid, np.searchsorted(sorted_ids, ids, side='right') - starts, 0)
+
+                first = np.repeat(np.arange(len(points)), sizes)
+                second = order[gather_ranges(starts, sizes)]
+
+                # Each pair is seen from both of its points, keep it once
+                keep = first < second
+                first = first[keep]
+                second = second[keep]
+
+                close = np.linalg.norm(points[first] - points[second], axis=-1) <= distance
+                found.append(np.stack((first[close], second[close]), axis=-1))
+
+    return np.concatenate(found)
+
+
+def scan_mesh_health(mesh, merge_distance=0.0001, area_threshold=1e-10):
+    """Run every health check on a mesh from one read of its arrays.
+
+    Returns the offender count per check and the vertex, edge and face masks of the offenders.
+    """
+    topology = read_topology(mesh)
+    positions = read_array(mesh.vertices, 'co', 3)
+    edges = topology["edges"]
+    loop_starts = topology["loop_starts"]
+    loop_totals = topology["loop_totals"]
+
+    # Duplicates: vertices within the merge distance of another one. The count is the number
+    # of vertices a merge would remove, one survivor per group of chained pairs.
+    duplicate_pairs = close_point_pairs(positions, merge_distance)
+    duplicate_vertices = np.zeros(len(positions), dtype=bool)
+    duplicate_vertices[duplicate_pairs.ravel()] = True
+    _islands, island_count = mesh_islands(len(positions), duplicate_pairs)
+    duplicate_count = len(positions) - island_count
+
+    face_areas = np.linalg.norm(polygon_vector_areas(positions, topology["loop_vertices"], loop_starts, loop_totals), axis=-1)
+    zero_area_faces = face_areas <= area_threshold
+
+    edge_face_counts = np.bincount(topology["loop_edges"], minlength=len(edges))
+    loose_edges = edge_face_counts == 0
+    non_manifold_edges = (edge_face_counts == 1) | (edge_face_counts > 2)
+
+    loose_vertices = np.ones(len(positions), dtype=bool)
+    loose_vertices[edges.ravel()] = False
+
+    uv_layer = mesh.uv_layers.active
+    if uv_layer is not None:
+        uvs = read_array(uv_layer.uv, 'vector', 2)
+        uv_areas = np.abs(polygon_vector_areas(uvs, np.arange(len(uvs)), loop_starts, loop_totals))
+        degenerate_uvs = uv_areas <= area_threshold
+    else:
+        degenerate_uvs = np.zeros(len(loop_starts), dtype=bool)
+
+    counts = {
+        'DUPLICATE_VERTICES': int(duplicate_count),
+        'ZERO_AREA_FACES': int(zero_area_faces.sum()),
+        'LOOSE_VERTICES': int(loose_vertices.sum()),
+        'LOOSE_EDGES': int(loose_edges.sum()),
+        'NON_MANIFOLD_EDGES': int(non_manifold_edges.sum()),
+        'DEGENERATE_UVS': int(degenerate_uvs.sum()),
+    }
+    masks = (
+        duplicate_vertices | loose_vertices,
+        loose_edges | non_manifold_edges,
+        zero_area_faces | degenerate_uvs,
+    )
+    return counts, masks, topology
+
+
+def scan_objects_health(objects, select=False, merge_distance=0.0001):
+    """Scan the meshes of the objects and optionally select only the offenders.
+
+    Returns the offender counts of every object, see scan_mesh_health.
+    """
+    results = {}
+    for obj in objects:
+        counts, masks, topology = scan_mesh_health(obj.data, merge_distance)
+        results[obj.name] = counts
+        if select:
+            select_elements(obj.data, topology, *masks)
+    return results
+
+
+# ----------------- Shape Keys -----------------
+
+# Bytes a shape key stores per vertex, one float3 coordinate
+SHAPE_KEY_VERTEX_BYTES = 12
+
+
+def read_shape_key_deltas(mesh):
+    """Return the names of all shape keys but the basis and their offsets from it as a (keys, vertices, 3) array."""
+    shape_keys = mesh.shape_keys
+    basis = read_array(shape_keys.reference_key.data, 'co', 3)
+    key_blocks = [key_block for key_block in shape_keys.key_blocks if key_block != shape_keys.reference_key]
+
+    deltas = np.empty((len(key_blocks), len(basis), 3), dtype=np.float32)
+    for i, key_block in enumerate(key_blocks):
+        deltas[i] = read_array(key_block.data, 'co', 3) - basis
+    return [key_block.name for key_block in key_blocks], deltas
+
+
+def find_prunable_shape_keys(mesh, threshold=0.0001, find_duplicates=True, keep_patterns=()):
+    """Find shape keys that move no vertex further than the threshold from the basis, and keys that
+    are within the threshold of an earlier key.
+
+    Returns the names of the zero keys and {duplicate name: name of the key it duplicates}.
+    Keys matching one of the keep patterns and keys other keys are relative to are never returned.
+    """
+    names, deltas = read_shape_key_deltas(mesh)
+    if not names:
+        return [], {}
+
+    used_as_relative = {key_block.relative_key.name for key_block in mesh.shape_keys.key_blocks if key_block.relative_key != key_block}
+    removable = np.array([
+        name not in used_as_relative and not any(fnmatchcase(name, pattern) for pattern in keep_patterns)
+        for name in names
+    ])
+
+    max_deltas = np.sqrt(np.einsum('kvi,kvi->kv', deltas, deltas)).max(axis=1)
+    zero = max_deltas <= threshold
+    zero_keys = [name for name, is_zero, can_remove in zip(names, zero, removable) if is_zero and can_remove]
+
+    duplicates = {}
+    if find_duplicates:
+        # Keys within the threshold on every vertex are also within threshold * sqrt(vertices) overall,
+        # so the distances of all key pairs from one matrix product narrow the pairs down to check
+        candidates = np.flatnonzero(~zero)
+        flat = deltas[candidates].reshape(len(candidates), -1).astype(np.float64)
+        squares = np.einsum('ij,ij->i', flat, flat)
+        distances = squares[:, None] + squares[None, :] - 2 * (flat @ flat.T)
+        close = distances <= threshold ** 2 * deltas.shape[1] + 1e-12
+
+        for j in range(len(candidates)):
+            if not removable[candidates[j]]:
+                continue
+            for i in np.flatnonzero(close[j, :j]).tolist():
+                if names[candidates[i]] in duplicates:
+                    continue
+                difference = deltas[candidates[j]] - deltas[candidates[i]]
+                if np.sqrt(np.einsum('vi,vi->v', difference, difference)).max() <= threshold:
+                    duplicates[names[candidates[j]]] = names[candidates[i]]
+                    break
+
+    return zero_keys, duplicates
+
+
+def retarget_shape_key_animation(key, old_name, new_name):
+    """Point the drivers and animation curves of one shape key at another, dropping them where the other has its own."""
+    animation_data = key.animation_data
+    if animation_data is None:
+        return
+
+    old_path = f'key_blocks["{old_name}"]'
+    new_path = f'key_blocks["{new_name}"]'
+    curve_sets = [animation_data.drivers]
+    if animation_data.action:
+        curve_sets.append(animation_data.action.fcurves)
+
+    for fcurves in curve_sets:
+        existing = {(fcurve.data_path, fcurve.array_index) for fcurve in fcurves}
+        for fcurve in [fcurve for fcurve in fcurves if fcurve.data_path.startswith(old_path)]:
+            data_path = new_path + fcurve.data_path[len(old_path):]
+            if (data_path, fcurve.array_index) in existing:
+                fcurves.remove(fcurve)
+            else:
+                fcurve.data_path = data_path
+
+
+def prune_shape_keys(objects, threshold=0.0001, merge_duplicates=True, keep_patterns=()):
+    """Remove zero shape keys and merge near-duplicate ones into the key they duplicate on the meshes
+    of the objects. Meshes left with only the basis lose their shape keys completely.
+
+    Returns {mesh name: (removed key names, bytes saved)}.
+    """
+    results = {}
+    for obj in objects:
+        mesh = obj.data
+        if obj.type != 'MESH' or mesh.name in results or mesh.shape_keys is None:
+            continue
+
+        zero_keys, duplicates = find_prunable_shape_keys(mesh, threshold, merge_duplicates, keep_patterns)
+        key = mesh.shape_keys
+        key_blocks = key.key_blocks
+
+        for duplicate, original in duplicates.items():
+            retarget_shape_key_animation(key, duplicate, original)
+        removed = zero_keys + list(duplicates)
+        for name in removed:
+            obj.shape_key_remove(key_blocks[name])
+
+        # A lone basis still makes every evaluation go through the shape key code
+        if len(key_blocks) == 1 and not any(fnmatchcase(key_blocks[0].name, pattern) for pattern in keep_patterns):
+            removed.append(key_blocks[0].name)
+            obj.shape_key_clear()
+
+        results[mesh.name] = (removed, len(removed) * len(mesh.vertices) * SHAPE_KEY_VERTEX_BYTES)
+
+    return results
+
+
+# ----------------- Weight Gradient -----------------
+
+# Weights written by write_group_weights are rounded to this many steps, one add() call per step
+WEIGHT_STEPS = 1000
+
+
+def gradient_weights(distances, radius, strength, gradient_type):
+    """Return the weight of a spherical LINEAR, SMOOTH or CONSTANT falloff at the given distances, clamped to 0..1."""
+    normalized = distances / radius if radius > 0 else np.zeros_like(distances)
+
+    if gradient_type == 'LINEAR':
+        weights = strength * (1 - normalized)
+    elif gradient_type == 'SMOOTH':
+        weights = strength * ((np.cos(np.pi * normalized) + 1) / 2)
+    elif gradient_type == 'CONSTANT':
+        weights = np.full_like(distances, strength)
+    else:
+        weights = np.zeros_like(distances)
+
+    weights[distances > radius] = 0.0
+    return np.clip(weights, 0.0, 1.0)
+
+
+def write_group_weights(vertex_group, weights, steps=WEIGHT_STEPS):
+    """Set the weight of every vertex in a vertex group, removing the vertices with no weight.
+
+    Weights are rounded to the given number of steps so vertices sharing a weight are added in one call.
+    """
+    quantized = np.round(np.asarray(weights) * steps).astype(np.int64)
+
+    empty = np.flatnonzero(quantized <= 0)
+    if len(empty):
+        vertex_group.remove(empty.tolist())
+
+    weighted = np.flatnonzero(quantized > 0)
+    order = weighted[np.argsort(quantized[weighted], kind='stable')]
+    values, starts = np.unique(quantized[order], return_index=True)
+    for value, vertices in zip(values.tolist(), np.split(order, starts[1:])):
+        vertex_group.add(vertices.tolist(), value / steps, 'REPLACE')
+
+    vertex_weight_cache.invalidate([vertex_group.id_data.data.session_uid])
+
+
+# Vertex and bone pairs measured at once by bone_gradient_weights, bounds the size of the distance matrix
+GRADIENT_CHUNK_PAIRS = 2_000_000
+
+
+def segment_distances(points, heads, tails):
+    """Return the distance of every point to every segment head..tail as a (points, segments) array."""
+    axes = tails - heads
+    lengths = np.maximum(np.einsum('bi,bi->b', axes, axes), 1e-12)
+    offsets = points[:, None, :] - heads[None, :, :]
+    # Position of the closest point along each segment, clamped to the ends
+    factors = np.clip(np.einsum('nbi,bi->nb', offsets, axes) / lengths, 0.0, 1.0)
+    return np.linalg.norm(offsets - factors[..., None] * axes[None, :, :], axis=2)
+
+
+def bone_gradient_weights(points, heads, tails, radius, strength, gradient_type, normalize=True):
+    """Weight the points for every bone by their distance to its head..tail segment, in chunks of points.
+
+    Returns the non-zero weights as (point indices, bone indices, weights) arrays. With normalize,
+    the weights of every point add up to one.
+    """
+    chunk_size = max(1, GRADIENT_CHUNK_PAIRS // max(len(heads), 1))
+    vertices = []
+    bones = []
+    weights = []
+
+    for start in range(0, len(points), chunk_size):
+        distances = segment_distances(points[start:start + chunk_size], heads, tails)
+        chunk_weights = gradient_weights(distances, radius, strength, gradient_type)
+        if normalize:
+            totals = chunk_weights.sum(axis=1, keepdims=True)
+            chunk_weights = np.divide(chunk_weights, totals, out=chunk_weights, where=totals > 0)
+
+        chunk_vertices, chunk_bones = np.nonzero(chunk_weights)
+        vertices.append(chunk_vertices + start)
+        bones.append(chunk_bones)
+        weights.append(chunk_weights[chunk_vertices, chunk_bones])
+
+    if not vertices:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    return np.concatenate(vertices), np.concatenate(bones), np.concatenate(weights)
+
+
+def capsule_bone_weights(points, heads, tails, max_influences=4, power=2.0, min_weight=0.01):
+    """Weight every point to its nearest bone segments by inverse distance, a quick stand-in for bone heat.
+
+    Only the max_influences nearest bones get weight, weights under min_weight are dropped and the
+    rest add up to one. Returns the weights as (point indices, bone indices, weights) arrays.
+    """
+    influences = min(max_influences, len(heads))
+    chunk_size = max(1, GRADIENT_CHUNK_PAIRS // max(len(heads), 1))
+    vertices = []
+    bones = []
+    weights = []
+
+    for start in range(0, len(points), chunk_size):
+        distances = segment_distances(points[start:start + chunk_size], heads, tails)
+        if influences < len(heads):
+            nearest = np.argpartition(distances, influences - 1, axis=1)[:, :influences]
+        else:
+            nearest = np.broadcast_to(np.arange(len(heads)), distances.shape)
+
+        chunk_weights = 1.0 / np.maximum(np.take_along_axis(distances, nearest, axis=1), 1e-6) ** power
+        chunk_weights /= chunk_weights.sum(axis=1, keepdims=True)
+        chunk_weights[chunk_weights < min_weight] = 0.0
+        chunk_weights /= chunk_weights.sum(axis=1, keepdims=True)
+
+        rows, columns = np.nonzero(chunk_weights)
+        vertices.append(rows + start)
+        bones.append(nearest[rows, columns])
+        weights.append(chunk_weights[rows, columns])
+
+    if not vertices:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    return np.concatenate(vertices), np.concatenate(bones), np.concatenate(weights)
+
+
+def bind_capsule_weights(obj, armature, max_influences=4):
+    """Replace the deform bone vertex groups of a mesh object with capsule weights from the armature's rest pose.
+
+    Returns the number of deform bones weighted.
+    """
+    deform_bones = [bone for bone in armature.data.bones if bone.use_deform]
+    if not deform_bones:
+        return 0
+
+    armature_to_obj = np.array(obj.matrix_world.inverted() @ armature.matrix_world)
+    heads = transform_points(np.array([bone.head_local for bone in deform_bones]), armature_to_obj)
+    tails = transform_points(np.array([bone.tail_local for bone in deform_bones]), armature_to_obj)
+
+    positions = read_array(obj.data.vertices, 'co', 3).astype(np.float64)
+    replace_bone_weights(obj, [bone.name for bone in deform_bones], *capsule_bone_weights(positions, heads, tails, max_influences))
+    return len(deform_bones)
+
+
+def replace_bone_weights(obj, bone_names, vertices, bones, weights):
+    """Replace the vertex groups of the bones with the given sparse weights, rounded to WEIGHT_STEPS."""
+    all_vertices = list(range(len(obj.data.vertices)))
+    group_indices = []
+    for name in bone_names:
+        vertex_group = obj.vertex_groups.get(name) or obj.vertex_groups.new(name=name)
+        vertex_group.remove(all_vertices)
+        group_indices.append(vertex_group.index)
+
+    weights = np.round(weights * WEIGHT_STEPS) / WEIGHT_STEPS
+    keep = weights > 0
+    write_vertex_weights(obj, vertices[keep], np.array(group_indices)[bones[keep]], weights[keep].astype(np.float32))
+    vertex_weight_cache.invalidate([obj.data.session_uid])
+
+
+# ----------------- Influence Limit -----------------
+
+def run_ranks(keys):
+    """Return the position of every element within its run of equal keys, keys must be sorted."""
+    return np.arange(len(keys)) - np.searchsorted(keys, keys)
+
+
+def limit_vertex_influences(vertex_weights, deform_groups, max_influences, normalize=True, steps=WEIGHT_STEPS):
+    """Keep the max_influences largest deform weights of every vertex and optionally make them add up to one.
+
+    Only groups flagged in deform_groups are touched. Normalized weights are rounded to the given steps
+    with the largest remainder method, so they add up to one exactly.
+    Returns the mask of changed vertices, the (vertices, groups) entries to remove and the
+    (vertices, groups, weights) entries to write.
+    """
+    indptr, groups, weights = vertex_weights
+    vertex_count = len(indptr) - 1
+    vertices = np.repeat(np.arange(vertex_count), np.diff(indptr))
+
+    deform = np.zeros(len(groups), dtype=bool)
+    known = groups < len(deform_groups)
+    deform[known] = deform_groups[groups[known]]
+    vertices, groups, weights = vertices[deform], groups[deform], weights[deform]
+
+    # Strongest weights first within every vertex
+    order = np.lexsort((-weights, vertices))
+    vertices, groups, weights = vertices[order], groups[order], weights[order]
+    keep = (run_ranks(vertices) < max_influences) & (weights > 0)
+
+    changed = np.zeros(vertex_count, dtype=bool)
+    changed[vertices[~keep]] = True
+    removed = (vertices[~keep], groups[~keep])
+
+    vertices, groups, weights = vertices[keep], groups[keep], weights[keep]
+    new_weights = weights
+    if normalize and len(weights):
+        totals = np.bincount(vertices, weights, minlength=vertex_count)
+        units = weights / totals[vertices] * steps
+        quantized = np.floor(units)
+        residuals = steps - np.bincount(vertices, quantized, minlength=vertex_count)
+
+        # Hand the missing steps to the weights that lost the most to rounding
+        order = np.lexsort((quantized - units, vertices))
+        bump = run_ranks(vertices[order]) < residuals[vertices[order]]
+        quantized[order[bump]] += 1
+
+        new_weights = (quantized / steps).astype(np.float32)
+        changed[vertices[np.abs(new_weights - weights) > 1.0 / steps]] = True
+
+    written = changed[vertices]
+    return changed, removed, (vertices[written], groups[written], new_weights[written])
+
+
+def limit_bone_influences(obj, deform_names, max_influences=4, normalize=True):
+    """Limit and normalize the deform weights of a mesh object. Returns the number of changed vertices."""
+    mesh = obj.data
+    deform_groups = np.array([vertex_group.name in deform_names for vertex_group in obj.vertex_groups], dtype=bool)
+    # Read the weights fresh rather than from the cache, they get written back
+    changed, (removed_vertices, removed_groups), written = limit_vertex_influences(
+        read_vertex_weights(mesh), deform_groups, max_influences, normalize
+    )
+
+    # One remove() call per group
+    order = np.argsort(removed_groups, kind='stable')
+    removed_vertices, removed_groups = removed_vertices[order], removed_groups[order]
+    values, starts = np.unique(removed_groups, return_index=True)
+    for group, vertices in zip(values.tolist(), np.split(removed_vertices, starts[1:])):
+        obj.vertex_groups[group].remove(vertices.tolist())
+
+    write_vertex_weights(obj, *written)
+    vertex_weight_cache.invalidate([mesh.session_uid])
+    return int(changed.sum())
+
+
+# ----------------- Texture Atlas -----------------
+
+# Side length of the tile used for materials without a base color image
+SOLID_TILE_SIZE = 8
+
+
+def linear_to_srgb(values):
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * np.power(values, 1 / 2.4) - 0.055)
+
+
+def get_principled_node(material):
+    if material is None or not material.use_nodes:
+        return None
+    return next((node for node in material.node_tree.nodes if node.type == 'BSDF_PRINCIPLED'), None)
+
+
+def get_base_color_image(material):
+    """Return the image plugged straight into the Base Color of the material's Principled BSDF, or None."""
+    node = get_principled_node(material)
+    if node is None:
+        return None
+    base_color = node.inputs["Base Color"]
+    if not base_color.is_linked:
+        return None
+    image_node = base_color.links[0].from_node
+    return image_node.image if image_node.type == 'TEX_IMAGE' else None
+
+
+def read_image_pixels(image):
+    """Return the pixels of an image as an sRGB (height, width, 4) float array, bottom row first."""
+    width, height = image.size
+    channels = image.channels
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, channels)
+
+    if channels < 3:
+        pixels = np.concatenate([np.repeat(pixels[..., :1], 3, axis=2), pixels[..., 1:]], axis=2)
+    if pixels.shape[2] == 3:
+        pixels = np.concatenate([pixels, np.ones((height, width, 1), dtype=np.float32)], axis=2)
+
+    # Float images hold linear values, the atlas stores sRGB like the usual color textures
+    if image.is_float and image.colorspace_settings.name != 'sRGB':
+        pixels[..., :3] = linear_to_srgb(pixels[..., :3])
+    return pixels
+
+
+def material_tile(material):
+    """Return the pixels standing in for a material in the atlas: its base color image or a solid color."""
+    image = get_base_color_image(material)
+    if image is not None and image.size[0] and image.size[1]:
+        return read_image_pixels(image)
+
+    node = get_principled_node(material)
+    color = np.array(node.inputs["Base Color"].default_value if node else material.diffuse_color, dtype=np.float32)
+    color[:3] = linear_to_srgb(color[:3])
+    return np.broadcast_to(color, (SOLID_TILE_SIZE, SOLID_TILE_SIZE, 4)).copy()
+
+
+def resize_pixels(pixels, scale):
+    """Nearest neighbour resize of a (height, width, 4) array."""
+    height, width = pixels.shape[:2]
+    rows = np.minimum((np.arange(max(1, round(height * scale))) / scale).astype(np.int64), height - 1)
+    columns = np.minimum((np.arange(max(1, round(width * scale))) / scale).astype(np.int64), width - 1)
+    return pixels[rows[:, None], columns]
+
+
+def build_atlas_pixels(tiles, padding, max_size):
+    """Pack the tiles into one atlas, with the tiles scaled down if it would exceed max_size.
+
+    Returns the atlas pixels and the (x, y, width, height) pixel rectangle of every tile.
+    """
+    scale = 1.0
+    scaled_tiles = tiles
+    while True:
+        sizes = np.array([(tile.shape[1], tile.shape[0]) for tile in scaled_tiles], dtype=np.float64)
+        positions = shelf_pack(sizes, padding * 2)
+        extent = (positions + sizes + padding * 2).max(axis=0)
+        if extent.max() <= max_size or sizes.max() <= 1:
+            break
+
+        # The padding doesn't shrink with the tiles, so shrink them again until the whole atlas fits
+        scale *= max_size / extent.max()
+        scaled_tiles = [resize_pixels(tile, scale) for tile in tiles]
+
+    width, height = np.ceil(extent).astype(np.int64).tolist()
+    atlas = np.zeros((height, width, 4), dtype=np.float32)
+    rects = []
+    for tile, (x, y) in zip(scaled_tiles, positions.astype(np.int64).tolist()):
+        # Extend the border pixels into the padding so mipmaps and filtering don't bleed
+        atlas_tile = np.pad(tile, ((padding, padding), (padding, padding), (0, 0)), mode='edge')
+        atlas[y:y + atlas_tile.shape[0], x:x + atlas_tile.shape[1]] = atlas_tile
+        rects.append((x + padding, y + padding, tile.shape[1], tile.shape[0]))
+
+    return atlas, rects
+
+
+def remap_atlas_uvs(mesh, rects, slot_tiles, atlas_size):
+    """Move the UVs of the faces of every atlased material slot into the slot's atlas rectangle.
+
+    slot_tiles maps a material slot index to its tile index. UVs outside 0..1 are clamped,
+    tiling textures can't be kept in an atlas.
+    """
+    # The Image Texture node of the atlas material samples the render UV map
+    uv_layer = next((layer for layer in mesh.uv_layers if layer.active_render), mesh.uv_layers.active)
+    if uv_layer is None:
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+
+    uvs = read_array(uv_layer.uv, 'vector', 2)
+    loop_starts = read_array(mesh.polygons, 'loop_start', 1, np.int32)
+    loop_totals = read_array(mesh.polygons, 'loop_total', 1, np.int32)
+    material_indices = read_array(mesh.polygons, 'material_index', 1, np.int32)
+
+    # Per slot: atlas offset and scale in UV space, faces of other slots keep their UVs
+    slot_count = max(len(mesh.materials), 1)
+    offsets = np.zeros((slot_count, 2))
+    scales = np.ones((slot_count, 2))
+    remapped = np.zeros(slot_count, dtype=bool)
+    for slot, tile in slot_tiles.items():
+        x, y, width, height = rects[tile]
+        offsets[slot] = x / atlas_size[0], y / atlas_size[1]
+        scales[slot] = width / atlas_size[0], height / atlas_size[1]
+        remapped[slot] = True
+
+    loop_slots = np.zeros(len(uvs), dtype=np.int64)
+    loop_slots[gather_ranges(loop_starts, loop_totals)] = np.repeat(np.clip(material_indices, 0, slot_count - 1), loop_totals)
+
+    moved = remapped[loop_slots]
+    uvs[moved] = offsets[loop_slots[moved]] + np.clip(uvs[moved], 0.0, 1.0) * scales[loop_slots[moved]]
+    write_array(uv_layer.uv, 'vector', uvs, np.float32)
+
+
+def create_atlas_material(name, image):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    principled = next(node for node in nodes if node.type == 'BSDF_PRINCIPLED')
+
+    image_node = nodes.new('ShaderNodeTexImage')
+    image_node.image = image
+    image_node.location = (principled.location.x - 300, principled.location.y)
+    material.node_tree.links.new(image_node.outputs["Color"], principled.inputs["Base Color"])
+    material.node_tree.links.new(image_node.outputs["Alpha"], principled.inputs["Alpha"])
+    return material
+
+
+def replace_mesh_materials(mesh, materials, replacement):
+    """Put the replacement material in place of the given materials and merge the slots that end up equal."""
+    material_index = read_array(mesh.polygons, 'material_index', 1, np.int32)
+
+    slots = [replacement if mat in materials else mat for mat in mesh.materials]
+    merged = []
+    for mat in slots:
+        if mat not in merged:
+            merged.append(mat)
+    slot_map = np.array([merged.index(mat) for mat in slots] or [0], dtype=np.int32)
+
+    # Clearing the slots resets the face indices, so they are written back afterwards
+    mesh.materials.clear()
+    for mat in merged:
+        mesh.materials.append(mat)
+    write_array(mesh.polygons, 'material_index', slot_map[np.clip(material_index, 0, len(slot_map) - 1)], np.int32)
+
+
+def build_texture_atlas(objects, name, padding=4, max_size=4096):
+    """Merge the Principled BSDF materials of the objects into one material with an atlas of their base colors.
+
+    Returns the atlas material, or None if there was nothing to merge, and the merged materials.
+    """
+    meshes = {obj.data for obj in objects if obj.type == 'MESH'}
+
+    materials = []
+    for mesh in meshes:
+        for mat in mesh.materials:
+            if mat not in materials and get_principled_node(mat) is not None:
+                materials.append(mat)
+    if len(materials) < 2:
+        return None, materials
+
+    atlas_pixels, rects = build_atlas_pixels([material_tile(mat) for mat in materials], padding, max_size)
+    atlas_size = (atlas_pixels.shape[1], atlas_pixels.shape[0])
+
+    image = bpy.data.images.new(name, atlas_size[0], atlas_size[1], alpha=True)
+    image.pixels.foreach_set(atlas_pixels.ravel())
+    image.pack()
+
+    material = create_atlas_material(name, image)
+    for mesh in meshes:
+        slot_tiles = {slot: materials.index(mat) for slot, mat in enumerate(mesh.materials) if mat in materials}
+        if slot_tiles:
+            remap_atlas_uvs(mesh, rects, slot_tiles, atlas_size)
+            replace_mesh_materials(mesh, materials, material)
+
+    return material, materials
+
+
+
 # Configuration dictionary for thresholds
 RATING_THRESHOLDS = {
     "PC": {